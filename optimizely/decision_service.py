@@ -12,15 +12,19 @@
 # limitations under the License.
 
 from __future__ import annotations
-from typing import TYPE_CHECKING, NamedTuple, Optional, Sequence
+from functools import lru_cache
+import threading
+from typing import TYPE_CHECKING, Any, Hashable, Iterable, List, NamedTuple, Optional, Sequence, SupportsIndex
 
 from . import bucketer
 from . import entities
+from . import logger as _logging
 from .decision.optimizely_decide_option import OptimizelyDecideOption
 from .helpers import audience as audience_helper
 from .helpers import enums
 from .helpers import experiment as experiment_helper
 from .helpers import validator
+from .odp.lru_cache import LRUCache
 from .optimizely_user_context import OptimizelyUserContext, UserAttributes
 from .user_profile import UserProfile, UserProfileService, UserProfileTracker
 
@@ -38,19 +42,97 @@ class Decision(NamedTuple):
     source: Optional[str]
 
 
+# Decision returned when no rollout rule applies to the user. Decision is immutable, so it is safely shared.
+_EMPTY_ROLLOUT_DECISION = Decision(None, None, enums.DecisionSources.ROLLOUT)
+
+
+class _NullReasons(List[str]):
+    """ Decision reasons list which discards everything added to it.
+    Used when reasons are not requested, and returned by private helpers which have no reasons to report.
+    It always stays empty, so a single instance is shared. """
+
+    def append(self, reason: str) -> None:
+        pass
+
+    def extend(self, reasons: Iterable[str]) -> None:
+        pass
+
+    def insert(self, index: SupportsIndex, reason: str) -> None:
+        pass
+
+    def __iadd__(self, reasons: Iterable[str]) -> _NullReasons:  # type: ignore[override, misc]
+        return self
+
+    def __imul__(self, count: SupportsIndex) -> _NullReasons:
+        return self
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        pass
+
+
+_NULL_REASONS = _NullReasons()
+
+
+def _copy_reasons(reasons: Optional[list[str]]) -> list[str]:
+    """ Returns a new decision reasons list starting with the given reasons. The shared _NULL_REASONS
+    is returned as is, so reasons which are not requested stay discarded by the helpers it is passed to. """
+    if isinstance(reasons, _NullReasons):
+        return reasons
+    return list(reasons) if reasons else []
+
+
+@lru_cache(maxsize=1024)
+def _get_decision_context(
+    flag_key: str, rule_key: Optional[str] = None
+) -> OptimizelyUserContext.OptimizelyDecisionContext:
+    """ Returns a shared decision context for the given flag key and rule key.
+
+    Decision contexts are only used as lookup keys when deciding, so the same instance is reused for
+    every user instead of allocating a new one per decision. The shared instances must not be modified,
+    so they are never handed out of the SDK.
+
+    Args:
+      flag_key: Key of the flag.
+      rule_key: Key of the rule, None for the flag level.
+
+    Returns:
+      OptimizelyDecisionContext for the flag key and rule key.
+    """
+    return OptimizelyUserContext.OptimizelyDecisionContext(flag_key, rule_key)
+
+
 class DecisionService:
     """ Class encapsulating all decision related capabilities. """
 
-    def __init__(self, logger: Logger, user_profile_service: Optional[UserProfileService]):
+    def __init__(
+        self,
+        logger: Logger,
+        user_profile_service: Optional[UserProfileService],
+        decision_cache_size: int = 0
+    ):
         self.bucketer = bucketer.Bucketer()
         self.logger = logger
         self.user_profile_service = user_profile_service
 
-        # Map of user IDs to another map of experiments to variations.
+        # Cache of flag decisions by config revision, user, attributes, segments and flag key.
+        # Disabled unless a positive size is given.
+        self.decision_cache: Optional[LRUCache[Hashable, tuple[Decision, list[str]]]] = None
+        if decision_cache_size > 0:
+            self.decision_cache = LRUCache(decision_cache_size, 0)
+
+        # Map of (user ID, experiment ID) pairs to variation IDs.
         # This contains all the forced variations set by the user
         # by calling set_forced_variation (it is not the same as the
         # whitelisting forcedVariations data structure).
-        self.forced_variation_map: dict[str, dict[str, str]] = {}
+        self.forced_variation_map: dict[tuple[str, str], str] = {}
+
+        # Map of user IDs to the number of forced variations set for them. Users are kept
+        # after their last forced variation is removed, as they were in the original nested map.
+        self.forced_variation_users: dict[str, int] = {}
+
+        # Both maps above are copied on write under this lock and replaced, so that they can be read
+        # without locking on every decision.
+        self.forced_variation_lock = threading.Lock()
 
     def _get_bucketing_id(self, user_id: str, attributes: Optional[UserAttributes]) -> tuple[str, list[str]]:
         """ Helper method to determine bucketing ID for the user.
@@ -63,18 +145,16 @@ class DecisionService:
           String representing bucketing ID if it is a String type in attributes else return user ID
           array of log messages representing decision making.
         """
-        decide_reasons: list[str] = []
-        attributes = attributes or UserAttributes({})
-        bucketing_id = attributes.get(enums.ControlAttributes.BUCKETING_ID)
-
-        if bucketing_id is not None:
-            if isinstance(bucketing_id, str):
-                return bucketing_id, decide_reasons
-            message = 'Bucketing ID attribute is not a string. Defaulted to user_id.'
-            self.logger.warning(message)
-            decide_reasons.append(message)
+        bucketing_id = attributes.get(enums.ControlAttributes.BUCKETING_ID) if attributes else None
+
+        if bucketing_id is None:
+            return user_id, _NULL_REASONS
+        if isinstance(bucketing_id, str):
+            return bucketing_id, _NULL_REASONS
 
-        return user_id, decide_reasons
+        message = 'Bucketing ID attribute is not a string. Defaulted to user_id.'
+        self.logger.warning(message)
+        return user_id, [message]
 
     def set_forced_variation(
         self, project_config: ProjectConfig, experiment_key: str,
@@ -97,11 +177,22 @@ class DecisionService:
             return False
 
         experiment_id = experiment.id
+        forced_variation_key = (user_id, experiment_id)
         if variation_key is None:
-            if user_id in self.forced_variation_map:
-                experiment_to_variation_map = self.forced_variation_map[user_id]
-                if experiment_id in experiment_to_variation_map:
-                    del self.forced_variation_map[user_id][experiment_id]
+            with self.forced_variation_lock:
+                forced_variation_users = self.forced_variation_users
+                forced_variation_map = self.forced_variation_map
+                removed = user_id in forced_variation_users and forced_variation_key in forced_variation_map
+                if removed:
+                    forced_variation_map = dict(forced_variation_map)
+                    del forced_variation_map[forced_variation_key]
+                    forced_variation_users = dict(forced_variation_users)
+                    forced_variation_users[user_id] -= 1
+                    self.forced_variation_map = forced_variation_map
+                    self.forced_variation_users = forced_variation_users
+
+            if user_id in forced_variation_users:
+                if removed:
                     self.logger.debug(
                         f'Variation mapped to experiment "{experiment_key}" has been removed for user "{user_id}".'
                     )
@@ -125,10 +216,14 @@ class DecisionService:
 
         variation_id = forced_variation.id
 
-        if user_id not in self.forced_variation_map:
-            self.forced_variation_map[user_id] = {experiment_id: variation_id}
-        else:
-            self.forced_variation_map[user_id][experiment_id] = variation_id
+        with self.forced_variation_lock:
+            forced_variation_map = dict(self.forced_variation_map)
+            if forced_variation_key not in forced_variation_map:
+                forced_variation_users = dict(self.forced_variation_users)
+                forced_variation_users[user_id] = forced_variation_users.get(user_id, 0) + 1
+                self.forced_variation_users = forced_variation_users
+            forced_variation_map[forced_variation_key] = variation_id
+            self.forced_variation_map = forced_variation_map
 
         self.logger.debug(
             f'Set variation "{variation_id}" for experiment "{experiment_id}" and '
@@ -150,40 +245,37 @@ class DecisionService:
             The variation which the given user and experiment should be forced into and
              array of log messages representing decision making.
         """
-        decide_reasons: list[str] = []
-        if user_id not in self.forced_variation_map:
+        forced_variation_users = self.forced_variation_users
+        if user_id not in forced_variation_users:
             message = f'User "{user_id}" is not in the forced variation map.'
             self.logger.debug(message)
-            return None, decide_reasons
+            return None, []
 
         experiment = project_config.get_experiment_from_key(experiment_key)
         if not experiment:
             # The invalid experiment key will be logged inside this call.
-            return None, decide_reasons
-
-        experiment_to_variation_map = self.forced_variation_map.get(user_id)
+            return None, []
 
-        if not experiment_to_variation_map:
+        if not forced_variation_users[user_id]:
             message = f'No experiment "{experiment_key}" mapped to user "{user_id}" in the forced variation map.'
             self.logger.debug(message)
-            return None, decide_reasons
+            return None, []
 
-        variation_id = experiment_to_variation_map.get(experiment.id)
+        variation_id = self.forced_variation_map.get((user_id, experiment.id))
         if variation_id is None:
             message = f'No variation mapped to experiment "{experiment_key}" in the forced variation map.'
             self.logger.debug(message)
-            return None, decide_reasons
+            return None, []
 
         variation = project_config.get_variation_from_id(experiment_key, variation_id)
         # this case is logged in get_variation_from_id
         if variation is None:
-            return None, decide_reasons
+            return None, []
 
         message = f'Variation "{variation.key}" is mapped to experiment "{experiment_key}" and ' \
                   f'user "{user_id}" in the forced variation map'
         self.logger.debug(message)
-        decide_reasons.append(message)
-        return variation, decide_reasons
+        return variation, [message]
 
     def get_whitelisted_variation(
         self, project_config: ProjectConfig, experiment: entities.Experiment, user_id: str
@@ -248,8 +340,10 @@ class DecisionService:
         experiment: entities.Experiment,
         user_context: OptimizelyUserContext,
         user_profile_tracker: Optional[UserProfileTracker],
-        reasons: list[str] = [],
-        options: Optional[Sequence[str]] = None
+        reasons: Optional[list[str]] = None,
+        options: Optional[Sequence[str]] = None,
+        audience_results: Optional[dict[str, Optional[bool]]] = None,
+        build_messages: bool = True
     ) -> tuple[Optional[entities.Variation], list[str]]:
         """ Top-level function to help determine variation user should be put in.
 
@@ -266,6 +360,9 @@ class DecisionService:
           user_profile_tracker: tracker for reading and updating user profile of the user.
           reasons: Decision reasons.
           options: Decide options.
+          audience_results: Optional dict of audience results of the user, shared by the decisions of a flag list.
+          build_messages: Whether log messages and decision reasons are built. When False they are neither
+                          logged nor added to the reasons.
 
         Returns:
           Variation user should see. None if user is not in experiment or experiment is not running
@@ -278,26 +375,25 @@ class DecisionService:
         else:
             ignore_user_profile = False
 
-        decide_reasons = []
-        if reasons is not None:
-            decide_reasons += reasons
+        decide_reasons = _copy_reasons(reasons)
         # Check if experiment is running
         if not experiment_helper.is_experiment_running(experiment):
-            message = f'Experiment "{experiment.key}" is not running.'
-            self.logger.info(message)
-            decide_reasons.append(message)
+            if build_messages:
+                message = f'Experiment "{experiment.key}" is not running.'
+                self.logger.info(message)
+                decide_reasons.append(message)
             return None, decide_reasons
 
         # Check if the user is forced into a variation
         variation: Optional[entities.Variation]
         variation, reasons_received = self.get_forced_variation(project_config, experiment.key, user_id)
-        decide_reasons += reasons_received
+        decide_reasons.extend(reasons_received)
         if variation:
             return variation, decide_reasons
 
         # Check to see if user is white-listed for a certain variation
         variation, reasons_received = self.get_whitelisted_variation(project_config, experiment, user_id)
-        decide_reasons += reasons_received
+        decide_reasons.extend(reasons_received)
         if variation:
             return variation, decide_reasons
 
@@ -305,10 +401,11 @@ class DecisionService:
         if user_profile_tracker is not None and not ignore_user_profile:
             variation = self.get_stored_variation(project_config, experiment, user_profile_tracker.get_user_profile())
             if variation:
-                message = f'Returning previously activated variation ID "{variation}" of experiment ' \
-                          f'"{experiment}" for user "{user_id}" from user profile.'
-                self.logger.info(message)
-                decide_reasons.append(message)
+                if build_messages:
+                    message = f'Returning previously activated variation ID "{variation}" of experiment ' \
+                              f'"{experiment}" for user "{user_id}" from user profile.'
+                    self.logger.info(message)
+                    decide_reasons.append(message)
                 return variation, decide_reasons
             else:
                 self.logger.warning('User profile has invalid format.')
@@ -319,23 +416,25 @@ class DecisionService:
             project_config, audience_conditions,
             enums.ExperimentAudienceEvaluationLogs,
             experiment.key,
-            user_context, self.logger)
-        decide_reasons += reasons_received
+            user_context, self.logger, audience_results=audience_results, build_messages=build_messages)
+        decide_reasons.extend(reasons_received)
         if not user_meets_audience_conditions:
-            message = f'User "{user_id}" does not meet conditions to be in experiment "{experiment.key}".'
-            self.logger.info(message)
-            decide_reasons.append(message)
+            if build_messages:
+                message = f'User "{user_id}" does not meet conditions to be in experiment "{experiment.key}".'
+                self.logger.info(message)
+                decide_reasons.append(message)
             return None, decide_reasons
 
         # Determine bucketing ID to be used
         bucketing_id, bucketing_id_reasons = self._get_bucketing_id(user_id, user_context.get_user_attributes())
-        decide_reasons += bucketing_id_reasons
+        decide_reasons.extend(bucketing_id_reasons)
         variation, bucket_reasons = self.bucketer.bucket(project_config, experiment, user_id, bucketing_id)
-        decide_reasons += bucket_reasons
+        decide_reasons.extend(bucket_reasons)
         if isinstance(variation, entities.Variation):
-            message = f'User "{user_id}" is in variation "{variation.key}" of experiment {experiment.key}.'
-            self.logger.info(message)
-            decide_reasons.append(message)
+            if build_messages:
+                message = f'User "{user_id}" is in variation "{variation.key}" of experiment {experiment.key}.'
+                self.logger.info(message)
+                decide_reasons.append(message)
             # Store this new decision and return the variation for the user
             if user_profile_tracker is not None and not ignore_user_profile:
                 try:
@@ -343,13 +442,72 @@ class DecisionService:
                 except:
                     self.logger.exception(f'Unable to save user profile for user "{user_id}".')
             return variation, decide_reasons
-        message = f'User "{user_id}" is in no variation.'
-        self.logger.info(message)
-        decide_reasons.append(message)
+        if build_messages:
+            message = f'User "{user_id}" is in no variation.'
+            self.logger.info(message)
+            decide_reasons.append(message)
         return None, decide_reasons
 
+    def _evaluate_rollout_rule(
+        self,
+        project_config: ProjectConfig,
+        rule: entities.Experiment,
+        logging_key: str,
+        user_context: OptimizelyUserContext,
+        bucketing_id: str,
+        decide_reasons: list[str],
+        audience_results: Optional[dict[str, Optional[bool]]] = None,
+        build_messages: bool = True
+    ) -> tuple[bool, Optional[entities.Variation]]:
+        """ Helper method to evaluate the audience of a targeting rule and bucket the user into it
+        when the audience matches.
+
+        Args:
+          project_config: Instance of ProjectConfig.
+          rule: Targeting rule (experiment) of the rollout.
+          logging_key: Name of the rule used in log messages.
+          user_context: user context for user.
+          bucketing_id: ID to bucket the user with.
+          decide_reasons: List the decision reasons of the rule are appended to.
+          audience_results: Optional dict of audience results of the user, shared by the decisions of a flag list.
+          build_messages: Whether log messages and decision reasons are built.
+
+        Returns:
+          Boolean representing whether the user meets the audience conditions of the rule and
+          the variation the user is bucketed into, None if not bucketed.
+        """
+        user_id = user_context.user_id
+
+        audience_decision_response, reasons_received = audience_helper.does_user_meet_audience_conditions(
+            project_config, rule.get_audience_conditions_or_ids(), enums.RolloutRuleAudienceEvaluationLogs,
+            logging_key, user_context, self.logger, audience_results=audience_results, build_messages=build_messages)
+        decide_reasons.extend(reasons_received)
+
+        if not audience_decision_response:
+            if build_messages:
+                message = f'User "{user_id}" does not meet audience conditions for targeting rule {logging_key}.'
+                self.logger.debug(message)
+                decide_reasons.append(message)
+            return False, None
+
+        if build_messages:
+            message = f'User "{user_id}" meets audience conditions for targeting rule {logging_key}.'
+            self.logger.debug(message)
+            decide_reasons.append(message)
+
+        bucketed_variation, reasons_received = self.bucketer.bucket(project_config, rule, user_id, bucketing_id)
+        decide_reasons.extend(reasons_received)
+
+        return True, bucketed_variation
+
     def get_variation_for_rollout(
-        self, project_config: ProjectConfig, feature: entities.FeatureFlag, user_context: OptimizelyUserContext
+        self,
+        project_config: ProjectConfig,
+        feature: entities.FeatureFlag,
+        user_context: OptimizelyUserContext,
+        audience_results: Optional[dict[str, Optional[bool]]] = None,
+        reasons: Optional[list[str]] = None,
+        build_messages: bool = True
     ) -> tuple[Decision, list[str]]:
         """ Determine which experiment/variation the user is in for a given rollout.
             Returns the variation of the first experiment the user qualifies for.
@@ -360,102 +518,99 @@ class DecisionService:
           rollout: Rollout for which we are getting the variation.
           user: ID and attributes for user.
           options: Decide options.
+          audience_results: Optional dict of audience results of the user, shared by the decisions of a flag list.
+          reasons: Decision reasons.
+          build_messages: Whether log messages and decision reasons are built. When False they are neither
+                          logged nor added to the reasons.
 
         Returns:
           Decision namedtuple consisting of experiment and variation for the user and
           array of log messages representing decision making.
         """
-        decide_reasons: list[str] = []
-        user_id = user_context.user_id
-        attributes = user_context.get_user_attributes()
+        decide_reasons = _copy_reasons(reasons)
 
         if not feature or not feature.rolloutId:
-            return Decision(None, None, enums.DecisionSources.ROLLOUT), decide_reasons
+            return _EMPTY_ROLLOUT_DECISION, decide_reasons
+        user_id = user_context.user_id
+        attributes = user_context.get_user_attributes()
 
         rollout = project_config.get_rollout_from_id(feature.rolloutId)
 
         if not rollout:
-            message = f'There is no rollout of feature {feature.key}.'
-            self.logger.debug(message)
-            decide_reasons.append(message)
-            return Decision(None, None, enums.DecisionSources.ROLLOUT), decide_reasons
+            if build_messages:
+                message = f'There is no rollout of feature {feature.key}.'
+                self.logger.debug(message)
+                decide_reasons.append(message)
+            return _EMPTY_ROLLOUT_DECISION, decide_reasons
 
         rollout_rules = project_config.get_rollout_experiments(rollout)
 
         if not rollout_rules:
-            message = f'Rollout {rollout.id} has no experiments.'
-            self.logger.debug(message)
-            decide_reasons.append(message)
-            return Decision(None, None, enums.DecisionSources.ROLLOUT), decide_reasons
+            if build_messages:
+                message = f'Rollout {rollout.id} has no experiments.'
+                self.logger.debug(message)
+                decide_reasons.append(message)
+            return _EMPTY_ROLLOUT_DECISION, decide_reasons
 
-        index = 0
-        while index < len(rollout_rules):
-            skip_to_everyone_else = False
+        # bucketing ID depends only on the user, so it is resolved once on the first rule evaluated
+        bucketing_id: Optional[str] = None
 
-            # check forced decision first
-            rule = rollout_rules[index]
-            optimizely_decision_context = OptimizelyUserContext.OptimizelyDecisionContext(feature.key, rule.key)
-            forced_decision_variation, reasons_received = self.validated_forced_decision(
-                project_config, optimizely_decision_context, user_context)
-            decide_reasons += reasons_received
-
-            if forced_decision_variation:
-                return Decision(experiment=rule, variation=forced_decision_variation,
-                                source=enums.DecisionSources.ROLLOUT), decide_reasons
+        # forced decisions of the flag keyed by rule key, fetched once for all targeting rules
+        forced_decisions = user_context.get_forced_decisions_for_flag(feature.key)
 
-            bucketing_id, bucket_reasons = self._get_bucketing_id(user_id, attributes)
-            decide_reasons += bucket_reasons
+        log_debug = self.logger.debug
+        last_index = len(rollout_rules) - 1
 
-            everyone_else = (index == len(rollout_rules) - 1)
-            logging_key = "Everyone Else" if everyone_else else str(index + 1)
+        # set when the user meets a rule's audience but is not bucketed into it; only the last rule
+        # ("Everyone Else") is evaluated after that
+        skip_to_everyone_else = False
 
-            rollout_rule = project_config.get_experiment_from_id(rule.id)
-            # error is logged in get_experiment_from_id
-            if rollout_rule is None:
+        for index, rule in enumerate(rollout_rules):
+            everyone_else = (index == last_index)
+            if skip_to_everyone_else and not everyone_else:
                 continue
-            audience_conditions = rollout_rule.get_audience_conditions_or_ids()
 
-            audience_decision_response, reasons_received_audience = audience_helper.does_user_meet_audience_conditions(
-                project_config, audience_conditions, enums.RolloutRuleAudienceEvaluationLogs,
-                logging_key, user_context, self.logger)
+            # check forced decision first
+            if forced_decisions:
+                forced_decision_variation, reasons_received = self._validate_forced_decision(
+                    project_config, forced_decisions.get(rule.key), feature.key, rule.key, user_context,
+                    build_messages=build_messages)
+                decide_reasons.extend(reasons_received)
+
+                if forced_decision_variation:
+                    return Decision(experiment=rule, variation=forced_decision_variation,
+                                    source=enums.DecisionSources.ROLLOUT), decide_reasons
 
-            decide_reasons += reasons_received_audience
+            if bucketing_id is None:
+                bucketing_id, bucket_reasons = self._get_bucketing_id(user_id, attributes)
+                decide_reasons.extend(bucket_reasons)
 
-            if audience_decision_response:
-                message = f'User "{user_id}" meets audience conditions for targeting rule {logging_key}.'
-                self.logger.debug(message)
-                decide_reasons.append(message)
+            logging_key = "Everyone Else" if everyone_else else str(index + 1)
 
-                bucketed_variation, bucket_reasons = self.bucketer.bucket(project_config, rollout_rule, user_id,
-                                                                          bucketing_id)
-                decide_reasons.extend(bucket_reasons)
+            audience_matched, bucketed_variation = self._evaluate_rollout_rule(
+                project_config, rule, logging_key, user_context, bucketing_id, decide_reasons,
+                audience_results=audience_results, build_messages=build_messages)
 
-                if bucketed_variation:
+            if bucketed_variation:
+                if build_messages:
                     message = f'User "{user_id}" bucketed into a targeting rule {logging_key}.'
-                    self.logger.debug(message)
+                    log_debug(message)
                     decide_reasons.append(message)
-                    return Decision(experiment=rule, variation=bucketed_variation,
-                                    source=enums.DecisionSources.ROLLOUT), decide_reasons
+                return Decision(experiment=rule, variation=bucketed_variation,
+                                source=enums.DecisionSources.ROLLOUT), decide_reasons
 
-                elif not everyone_else:
-                    # skip this logging for EveryoneElse since this has a message not for everyone_else
+            if audience_matched and not everyone_else:
+                # skip this logging for EveryoneElse since this has a message not for everyone_else
+                if build_messages:
                     message = f'User "{user_id}" not bucketed into a targeting rule {logging_key}. ' \
                               'Checking "Everyone Else" rule now.'
-                    self.logger.debug(message)
+                    log_debug(message)
                     decide_reasons.append(message)
 
-                    # skip the rest of rollout rules to the everyone-else rule if audience matches but not bucketed.
-                    skip_to_everyone_else = True
+                # skip the rest of rollout rules to the everyone-else rule if audience matches but not bucketed.
+                skip_to_everyone_else = True
 
-            else:
-                message = f'User "{user_id}" does not meet audience conditions for targeting rule {logging_key}.'
-                self.logger.debug(message)
-                decide_reasons.append(message)
-
-            # the last rule is special for "Everyone Else"
-            index = len(rollout_rules) - 1 if skip_to_everyone_else else index + 1
-
-        return Decision(None, None, enums.DecisionSources.ROLLOUT), decide_reasons
+        return _EMPTY_ROLLOUT_DECISION, decide_reasons
 
     def get_variation_for_feature(
         self,
@@ -481,7 +636,8 @@ class DecisionService:
         self,
         project_config: ProjectConfig,
         decision_context: OptimizelyUserContext.OptimizelyDecisionContext,
-        user_context: OptimizelyUserContext
+        user_context: OptimizelyUserContext,
+        build_messages: bool = True
     ) -> tuple[Optional[entities.Variation], list[str]]:
         """
         Gets forced decisions based on flag key, rule key and variation.
@@ -490,22 +646,51 @@ class DecisionService:
             project_config: a project config
             decision context: a decision context
             user_context context: a user context
+            build_messages: whether log messages and decision reasons are built
 
         Returns:
             Variation of the forced decision.
         """
-        reasons: list[str] = []
-
         forced_decision = user_context.get_forced_decision(decision_context)
 
-        flag_key = decision_context.flag_key
-        rule_key = decision_context.rule_key
+        return self._validate_forced_decision(
+            project_config, forced_decision, decision_context.flag_key, decision_context.rule_key, user_context,
+            build_messages=build_messages
+        )
+
+    def _validate_forced_decision(
+        self,
+        project_config: ProjectConfig,
+        forced_decision: Optional[OptimizelyUserContext.OptimizelyForcedDecision],
+        flag_key: str,
+        rule_key: Optional[str],
+        user_context: OptimizelyUserContext,
+        build_messages: bool = True
+    ) -> tuple[Optional[entities.Variation], list[str]]:
+        """
+        Validates a forced decision already looked up for the given flag key and rule key.
+
+        Args:
+            project_config: a project config
+            forced_decision: forced decision set for the flag key and rule key, if any
+            flag_key: a flag key
+            rule_key: a rule key, None for the flag level forced decision
+            user_context context: a user context
+            build_messages: whether log messages and decision reasons are built
+
+        Returns:
+            Variation of the forced decision.
+        """
+        reasons: list[str] = []
 
         if forced_decision:
             if not project_config:
                 return None, reasons
             variation = project_config.get_flag_variation(flag_key, 'key', forced_decision.variation_key)
             if variation:
+                if not build_messages:
+                    return variation, reasons
+
                 if rule_key:
                     user_has_forced_decision = enums.ForcedDecisionLogs \
                         .USER_HAS_FORCED_DECISION_WITH_RULE_SPECIFIED.format(forced_decision.variation_key,
@@ -524,7 +709,7 @@ class DecisionService:
 
                 return variation, reasons
 
-            else:
+            elif build_messages:
                 if rule_key:
                     user_has_forced_decision_but_invalid = enums.ForcedDecisionLogs \
                         .USER_HAS_FORCED_DECISION_WITH_RULE_SPECIFIED_BUT_INVALID.format(flag_key,
@@ -540,6 +725,48 @@ class DecisionService:
 
         return None, reasons
 
+    def _get_decision_cache_key(
+        self,
+        project_config: ProjectConfig,
+        user_context: OptimizelyUserContext,
+        include_reasons: bool
+    ) -> Optional[tuple[Hashable, ...]]:
+        """ Helper method to build the part of the decision cache key shared by all flags of a user.
+
+        Args:
+          project_config: Instance of ProjectConfig.
+          user_context: user context for user.
+          include_reasons: Whether decision reasons are collected.
+
+        Returns:
+          Tuple identifying the inputs of the user's decisions, or None if they must not be cached.
+        """
+        user_id = user_context.user_id
+
+        # forced decisions and forced variations can change without a new config revision
+        if user_context.forced_decisions_map or self.forced_variation_users.get(user_id):
+            return None
+
+        try:
+            # values are tagged with their type, as equal values of different types (True and 1)
+            # do not meet the same audience conditions
+            attributes = frozenset(
+                (key, type(value), value) for key, value in user_context.get_user_attributes().items()
+            )
+        except TypeError:
+            # unhashable attribute values
+            return None
+
+        segments = user_context.get_qualified_segments()
+
+        return (
+            project_config.revision,
+            user_id,
+            attributes,
+            tuple(segments) if segments is not None else None,
+            include_reasons
+        )
+
     def get_variations_for_feature_list(
         self,
         project_config: ProjectConfig,
@@ -557,71 +784,115 @@ class DecisionService:
 
         Returns:
             List of Decision namedtuple consisting of experiment and variation for the user.
+            Reasons are only collected when the INCLUDE_REASONS option is provided.
+            Decisions are served from the decision cache when it is enabled.
         """
         decide_reasons: list[str] = []
 
         if options:
             ignore_ups = OptimizelyDecideOption.IGNORE_USER_PROFILE_SERVICE in options
+            include_reasons = OptimizelyDecideOption.INCLUDE_REASONS in options
         else:
             ignore_ups = False
+            include_reasons = False
 
         user_profile_tracker: Optional[UserProfileTracker] = None
         if self.user_profile_service is not None and not ignore_ups:
             user_profile_tracker = UserProfileTracker(user_context.user_id, self.user_profile_service, self.logger)
             user_profile_tracker.load_user_profile(decide_reasons, None)
 
+        # decisions are only cached when they do not depend on the stored user profile
+        decision_cache = self.decision_cache if user_profile_tracker is None else None
+        cache_key: Optional[tuple[Hashable, ...]] = None
+        if decision_cache is not None:
+            cache_key = self._get_decision_cache_key(project_config, user_context, include_reasons)
+            if cache_key is None:
+                decision_cache = None
+
         decisions = []
 
+        # bind lookups used once per feature outside of the loop
+        user_id = user_context.user_id
+        get_experiment_from_id = project_config.get_experiment_from_id
+        validate_forced_decision = self._validate_forced_decision
+        get_variation = self.get_variation
+        get_variation_for_rollout = self.get_variation_for_rollout
+        log_debug = self.logger.debug
+        debug_enabled = _logging.is_debug_enabled(self.logger)
+        # messages of the rules are only built when they are logged or returned as reasons
+        build_messages = include_reasons or _logging.is_info_enabled(self.logger)
+        feature_test_source = enums.DecisionSources.FEATURE_TEST
+
+        # audiences shared by several rules and flags are evaluated once for this user
+        audience_results: dict[str, Optional[bool]] = {}
         for feature in features:
-            feature_reasons = decide_reasons.copy()
+            if decision_cache is not None:
+                cached_decision = decision_cache.lookup((cache_key, feature.key))
+                if cached_decision is not None:
+                    decisions.append((cached_decision[0], list(cached_decision[1])))
+                    continue
+
+            feature_reasons: list[str]
+            if not include_reasons:
+                feature_reasons = _NULL_REASONS
+            else:
+                feature_reasons = decide_reasons.copy() if decide_reasons else []
             experiment_decision_found = False  # Track if an experiment decision was made for the feature
 
             # Check if the feature flag is under an experiment
             if feature.experimentIds:
+                # forced decisions of the flag keyed by rule key, fetched once for all experiments
+                forced_decisions = user_context.get_forced_decisions_for_flag(feature.key)
                 for experiment_id in feature.experimentIds:
-                    experiment = project_config.get_experiment_from_id(experiment_id)
+                    experiment = get_experiment_from_id(experiment_id)
                     decision_variation = None
 
                     if experiment:
-                        optimizely_decision_context = OptimizelyUserContext.OptimizelyDecisionContext(
-                            feature.key, experiment.key)
-                        forced_decision_variation, reasons_received = self.validated_forced_decision(
-                            project_config, optimizely_decision_context, user_context)
-                        feature_reasons.extend(reasons_received)
+                        forced_decision_variation = None
+                        if forced_decisions:
+                            forced_decision_variation, reasons_received = validate_forced_decision(
+                                project_config, forced_decisions.get(experiment.key), feature.key, experiment.key,
+                                user_context, build_messages=build_messages)
+                            feature_reasons.extend(reasons_received)
 
                         if forced_decision_variation:
                             decision_variation = forced_decision_variation
                         else:
-                            decision_variation, variation_reasons = self.get_variation(
-                                project_config, experiment, user_context, user_profile_tracker, feature_reasons, options
+                            decision_variation, variation_reasons = get_variation(
+                                project_config, experiment, user_context, user_profile_tracker, feature_reasons,
+                                options, audience_results=audience_results, build_messages=build_messages
                             )
                             feature_reasons.extend(variation_reasons)
 
                         if decision_variation:
-                            self.logger.debug(
-                                f'User "{user_context.user_id}" '
-                                f'bucketed into experiment "{experiment.key}" of feature "{feature.key}".'
-                            )
-                            decision = Decision(experiment, decision_variation, enums.DecisionSources.FEATURE_TEST)
+                            if debug_enabled:
+                                log_debug(
+                                    f'User "{user_id}" '
+                                    f'bucketed into experiment "{experiment.key}" of feature "{feature.key}".'
+                                )
+                            decision = Decision(experiment, decision_variation, feature_test_source)
                             decisions.append((decision, feature_reasons))
+                            if decision_cache is not None:
+                                decision_cache.save((cache_key, feature.key), (decision, list(feature_reasons)))
                             experiment_decision_found = True  # Mark that a decision was found
                             break  # Stop after the first successful experiment decision
 
             # Only process rollout if no experiment decision was found
             if not experiment_decision_found:
-                rollout_decision, rollout_reasons = self.get_variation_for_rollout(project_config,
-                                                                                   feature,
-                                                                                   user_context)
+                rollout_decision, rollout_reasons = get_variation_for_rollout(
+                    project_config, feature, user_context, audience_results=audience_results,
+                    reasons=None if include_reasons else _NULL_REASONS, build_messages=build_messages)
                 if rollout_reasons:
                     feature_reasons.extend(rollout_reasons)
-                if rollout_decision:
-                    self.logger.debug(f'User "{user_context.user_id}" '
-                                      f'bucketed into rollout for feature "{feature.key}".')
-                else:
-                    self.logger.debug(f'User "{user_context.user_id}" '
-                                      f'not bucketed into any rollout for feature "{feature.key}".')
+                if debug_enabled:
+                    if rollout_decision:
+                        log_debug(f'User "{user_id}" bucketed into rollout for feature "{feature.key}".')
+                    else:
+                        log_debug(f'User "{user_id}" not bucketed into any rollout for feature "{feature.key}".')
 
                 decisions.append((rollout_decision, feature_reasons))
+                if decision_cache is not None:
+                    decision_cache.save((cache_key, feature.key), (rollout_decision, list(feature_reasons)))
 
         if self.user_profile_service is not None and user_profile_tracker is not None and ignore_ups is False:
             user_profile_tracker.save_user_profile()
@@ -11,23 +11,284 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+import asyncio
+import atexit
 import json
 import logging
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Executor
 from sys import version_info
+from typing import Any, Callable, Hashable, Optional
+from urllib.parse import urlencode, urlsplit, urlunsplit
 
 import requests
 from requests import exceptions as request_exception
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
 from . import event_builder
-from .helpers.enums import HTTPVerbs, EventDispatchConfig
+from . import logger as _logging
+from .helpers.enums import HTTPHeaders, HTTPVerbs, EventDispatchConfig
 
 if version_info < (3, 8):
     from typing_extensions import Protocol
 else:
     from typing import Protocol  # type: ignore
 
+try:
+    # optional faster JSON encoder, the standard library json module is used when it is not installed
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+
+def _serialize(params: Any) -> bytes:
+    """ Serialize event params to the UTF-8 encoded JSON body of a POST request.
+
+    Args:
+      params: Event params to serialize.
+
+    Returns:
+      JSON body as bytes.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(params)
+        except TypeError:
+            # values orjson does not support are left to the json module
+            pass
+
+    return json.dumps(params).encode('utf-8')
+
+
+logger = logging.getLogger(__name__)
+
+# response statuses of requests worth retrying
+_RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+# response statuses of POST requests worth retrying, the backend rejected these before processing the events
+_POST_RETRY_STATUSES = frozenset((429, 503))
+_RETRY_BACKOFF = 0.1
+
+# bounds the number of event requests in flight at the same time, dispatches beyond it wait for a free slot
+_bulkhead = threading.BoundedSemaphore(EventDispatchConfig.MAX_CONCURRENT_REQUESTS)
+
+# session shared by all dispatched events, so that connections to the event endpoint are kept alive and reused
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """ Returns the session used to dispatch events, creating it on first use.
+
+    Returns:
+      Session with the event connection pool mounted for HTTP and HTTPS.
+    """
+    global _session
+
+    session = _session
+    if session is not None:
+        return session
+
+    with _session_lock:
+        if _session is None:
+            # A connection is kept per concurrent request to a host, e.g. for events dispatched by
+            # AsyncEventDispatcher. Failed requests are retried by _send_with_retries rather than by urllib3.
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=EventDispatchConfig.MAX_CONCURRENT_REQUESTS)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount("https://", adapter)
+            _session = session
+
+        return _session
+
+
+class CircuitBreaker:
+    """ Stops requests to a host which keeps failing.
+
+    After failure_threshold consecutive failures the circuit opens and requests are not allowed.
+    Once recovery_timeout seconds passed, a single trial request is allowed: the circuit closes
+    again when it succeeds and stays open for another recovery_timeout seconds when it fails.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = EventDispatchConfig.CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = EventDispatchConfig.CIRCUIT_RECOVERY_TIMEOUT
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        """ Property to check if requests are currently stopped. """
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        """ Returns whether a request may be sent now. """
+        if self.opened_at is None:
+            return True
+
+        with self.lock:
+            now = time.monotonic()
+            if self.opened_at is not None and now - self.opened_at < self.recovery_timeout:
+                return False
+
+            # allow one trial request and wait for another recovery timeout before the next one
+            self.opened_at = now
+            return True
+
+    def record_success(self) -> None:
+        """ Closes the circuit after a successful request. """
+        if self.failures or self.opened_at is not None:
+            with self.lock:
+                self.failures = 0
+                self.opened_at = None
+
+    def record_failure(self) -> None:
+        """ Counts a failed request and opens the circuit once the failure threshold is reached. """
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+# circuit breakers of the event dispatcher by host
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def _get_circuit_breaker(host: str) -> CircuitBreaker:
+    """ Returns the circuit breaker of the host, creating it on first use. """
+    breaker = _circuit_breakers.get(host)
+    if breaker is None:
+        with _circuit_breakers_lock:
+            breaker = _circuit_breakers.setdefault(host, CircuitBreaker())
+    return breaker
+
+
+def _reset_after_fork() -> None:
+    """ Drops the dispatcher state inherited from the parent process in a forked child.
+
+    The pooled connections of the parent session must not be shared with the parent, and request slots
+    or locks held by threads of the parent are never released in the child, as those threads do not exist there.
+    """
+    global _session, _session_lock, _bulkhead, _circuit_breakers_lock
+
+    _session = None
+    _session_lock = threading.Lock()
+    _bulkhead = threading.BoundedSemaphore(EventDispatchConfig.MAX_CONCURRENT_REQUESTS)
+    _circuit_breakers.clear()
+    _circuit_breakers_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _get_request(session: requests.Session, event: event_builder.Event) -> Callable[[], None]:
+    """ Returns a function sending the event params as the query string of a GET request.
+    The query string is encoded once here and reused by every attempt. As in requests, sequence values
+    add one param per item and values set to None, alone or in a sequence, are left out. """
+    url = event.url
+    query = urlencode([
+        (key, value)
+        for key, values in event.params.items()
+        for value in (values if hasattr(values, '__iter__') and not isinstance(values, (str, bytes)) else (values,))
+        if value is not None
+    ])
+    if query:
+        parts = urlsplit(url)
+        url = urlunsplit(parts._replace(query=f'{parts.query}&{query}' if parts.query else query))
+
+    def send() -> None:
+        session.get(url, timeout=EventDispatchConfig.REQUEST_TIMEOUT).raise_for_status()
+
+    return send
+
+
+# headers of POST requests for events which do not set a content type
+_JSON_HEADERS = {HTTPHeaders.CONTENT_TYPE: 'application/json'}
+
+
+def _post_request(session: requests.Session, event: event_builder.Event) -> Callable[[], None]:
+    """ Returns a function sending the event params as the JSON body of a POST request.
+    The body is serialized once here and reused by every attempt. """
+    body = _serialize(event.params)
+
+    headers = event.headers
+    if not headers:
+        headers = _JSON_HEADERS
+    elif HTTPHeaders.CONTENT_TYPE not in headers:
+        headers = {**_JSON_HEADERS, **headers}
+
+    def send() -> None:
+        session.post(
+            event.url, data=body, headers=headers,
+            timeout=EventDispatchConfig.REQUEST_TIMEOUT,
+        ).raise_for_status()
+
+    return send
+
+
+def _send_with_retries(
+    send: Callable[[], None],
+    retry_errors: tuple[type[request_exception.RequestException], ...] = (
+        request_exception.ConnectionError, request_exception.Timeout),
+    retry_statuses: frozenset[int] = _RETRY_STATUSES
+) -> None:
+    """ Sends a request, retrying the given errors and response statuses.
+
+    Retries wait a random time up to an exponentially growing backoff (full jitter), so that
+    clients failing at the same time do not retry at the same time.
+
+    Args:
+      send: Function sending the request.
+      retry_errors: Request errors worth retrying. Defaults to connection errors and timeouts.
+      retry_statuses: Response statuses worth retrying.
+
+    Raises:
+      RequestException of the last attempt when all attempts failed or the error is not retryable.
+    """
+    attempt = 0
+    while True:
+        try:
+            send()
+            return
+        except request_exception.RequestException as error:
+            if isinstance(error, request_exception.HTTPError):
+                response = error.response
+                if response is None or response.status_code not in retry_statuses:
+                    raise
+            elif not isinstance(error, retry_errors):
+                raise
+
+            if attempt >= EventDispatchConfig.RETRIES:
+                raise
+
+        time.sleep(random.uniform(0, _RETRY_BACKOFF * 2 ** attempt))
+        attempt += 1
+
+
+# request builders by HTTP verb of the event
+_REQUESTS: dict[str, Callable[[requests.Session, event_builder.Event], Callable[[], None]]] = {
+    HTTPVerbs.GET: _get_request,
+    HTTPVerbs.POST: _post_request,
+}
+
+# errors and response statuses retried by HTTP verb of the event. A POST request is not idempotent,
+# so it is only retried when it did not reach the backend (a read timeout may follow a processed request).
+_RETRY_POLICIES: dict[str, tuple[tuple[type[request_exception.RequestException], ...], frozenset[int]]] = {
+    HTTPVerbs.GET: ((request_exception.ConnectionError, request_exception.Timeout), _RETRY_STATUSES),
+    HTTPVerbs.POST: ((request_exception.ConnectionError,), _POST_RETRY_STATUSES),
+}
+
 
 class CustomEventDispatcher(Protocol):
     """Interface for a custom event dispatcher and required method `dispatch_event`. """
@@ -57,25 +318,235 @@ class EventDispatcher:
     Args:
       event: Object holding information about the request to be dispatched to the Optimizely backend.
     """
+        build_request = _REQUESTS.get(event.http_verb)
+        if build_request is None:
+            return
+
+        # a free slot is taken before asking the breaker, so a half-open trial it grants is always sent
+        if not _bulkhead.acquire(timeout=EventDispatchConfig.REQUEST_TIMEOUT):
+            logger.error('Dispatch event failed. Error: too many event requests in flight.')
+            return
+
+        host = urlsplit(event.url).netloc
+        breaker = _get_circuit_breaker(host)
+        if not breaker.allow():
+            _bulkhead.release()
+            logger.error('Dispatch event failed. Error: requests to %s are paused after repeated failures.', host)
+            return
+
         try:
-            session = requests.Session()
+            _send_with_retries(build_request(_get_session(), event), *_RETRY_POLICIES[event.http_verb])
+        except request_exception.RequestException as error:
+            response = error.response
+            if response is not None and response.status_code < 500 and response.status_code not in _RETRY_STATUSES:
+                # the backend is reachable, only this request was rejected. Statuses worth retrying,
+                # such as 429, tell that the backend is overloaded and count as failures.
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            logger.error('Dispatch event failed. Error: %s', error)
+        else:
+            breaker.record_success()
+        finally:
+            _bulkhead.release()
 
-            retries = Retry(total=EventDispatchConfig.RETRIES,
-                            backoff_factor=0.1,
-                            status_forcelist=[500, 502, 503, 504])
-            adapter = HTTPAdapter(max_retries=retries)
 
-            session.mount('http://', adapter)
-            session.mount("https://", adapter)
+class AsyncEventDispatcher:
+    """ Event dispatcher for asyncio applications.
 
-            if event.http_verb == HTTPVerbs.GET:
-                session.get(event.url, params=event.params,
-                            timeout=EventDispatchConfig.REQUEST_TIMEOUT).raise_for_status()
-            elif event.http_verb == HTTPVerbs.POST:
-                session.post(
-                    event.url, data=json.dumps(event.params), headers=event.headers,
-                    timeout=EventDispatchConfig.REQUEST_TIMEOUT,
-                ).raise_for_status()
+    Events are sent by EventDispatcher on an executor, so dispatching does not block the event loop
+    and events dispatched concurrently are sent concurrently. The SDK calls dispatch_event synchronously,
+    use to_sync to pass this dispatcher to Optimizely.
+    """
 
-        except request_exception.RequestException as error:
-            logging.error(f'Dispatch event failed. Error: {error}')
+    def __init__(self, executor: Optional[Executor] = None):
+        """
+        Args:
+          executor: Executor the events are sent on (optional). Defaults to the default executor of the event loop.
+        """
+        self.executor = executor
+
+    async def dispatch_event(self, event: event_builder.Event) -> None:
+        """ Dispatch the event being represented by the Event object.
+
+        Args:
+          event: Object holding information about the request to be dispatched to the Optimizely backend.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, EventDispatcher.dispatch_event, event)
+
+    def to_sync(self, loop: asyncio.AbstractEventLoop) -> CustomEventDispatcher:
+        """ Returns an event dispatcher which schedules dispatching of each event on the given event loop
+        and returns without waiting for it.
+
+        Args:
+          loop: Running event loop the events are dispatched on.
+
+        Returns:
+          Event dispatcher that can be passed to Optimizely.
+        """
+        return _ScheduledEventDispatcher(self, loop)
+
+
+class _ScheduledEventDispatcher:
+    """ Event dispatcher scheduling the events of an AsyncEventDispatcher on an event loop. """
+
+    def __init__(self, dispatcher: AsyncEventDispatcher, loop: asyncio.AbstractEventLoop):
+        self.dispatcher = dispatcher
+        self.loop = loop
+
+    def dispatch_event(self, event: event_builder.Event) -> None:
+        """ Schedule the event to be dispatched on the event loop.
+
+        Args:
+          event: Object holding information about the request to be dispatched to the Optimizely backend.
+        """
+        asyncio.run_coroutine_threadsafe(self.dispatcher.dispatch_event(event), self.loop)
+
+
+class BatchingEventDispatcher:
+    """ Event dispatcher which merges events and sends them with fewer requests.
+
+    Dispatched events are queued and sent by a background thread once batch_size events are queued
+    or every flush_interval seconds. POST events to the same URL with the same headers and batch
+    properties (account, project, revision, client) are merged into one event holding all their visitors.
+    Queued events are flushed when the dispatcher is stopped or the interpreter exits.
+    """
+
+    _DEFAULT_QUEUE_CAPACITY = 1000
+    _DEFAULT_BATCH_SIZE = 10
+    _DEFAULT_FLUSH_INTERVAL = 1
+    _STOP_TIMEOUT = 5
+
+    def __init__(
+        self,
+        event_dispatcher: Optional[type[EventDispatcher] | CustomEventDispatcher] = None,
+        logger: Optional[_logging.Logger] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        queue_capacity: Optional[int] = None
+    ):
+        """
+        Args:
+          event_dispatcher: Provides a dispatch_event method the merged events are sent with.
+                            Defaults to EventDispatcher.
+          logger: Optional component which provides a log method to log messages. By default nothing would be logged.
+          batch_size: Optional number of queued events after which the queue is flushed.
+          flush_interval: Optional time interval in seconds after which the queue is flushed.
+          queue_capacity: Optional maximum number of queued events. Events dispatched to a full queue are dropped.
+        """
+        self.event_dispatcher = event_dispatcher or EventDispatcher
+        self.logger = _logging.adapt_logger(logger or _logging.NoOpLogger())
+        self.batch_size = batch_size or self._DEFAULT_BATCH_SIZE
+        self.flush_interval = flush_interval or self._DEFAULT_FLUSH_INTERVAL
+        self.event_queue: queue.Queue[event_builder.Event] = queue.Queue(
+            maxsize=queue_capacity or self._DEFAULT_QUEUE_CAPACITY)
+
+        self._flush_lock = threading.Lock()
+        self._batch_ready = threading.Event()
+        self._stopped = threading.Event()
+        self.executor = threading.Thread(target=self._run, name="EventDispatcherThread", daemon=True)
+        self.executor.start()
+
+        atexit.register(self.flush)
+
+    def dispatch_event(self, event: event_builder.Event) -> None:
+        """ Queue the event to be dispatched with the next batch.
+
+        Args:
+          event: Object holding information about the request to be dispatched to the Optimizely backend.
+        """
+        if self._stopped.is_set():
+            self.logger.warning('Event not accepted by the queue. The dispatcher is stopped.')
+            return
+
+        try:
+            self.event_queue.put_nowait(event)
+        except queue.Full:
+            self.logger.warning(f'Event not accepted by the queue. Current size: {self.event_queue.qsize()}')
+            return
+
+        if self.event_queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+
+    def _run(self) -> None:
+        """ Flushes the queue when a batch is ready or the flush interval passed, until stopped. """
+        while not self._stopped.is_set():
+            self._batch_ready.wait(self.flush_interval)
+            self._batch_ready.clear()
+            self.flush()
+
+    def stop(self) -> None:
+        """ Stops the background thread and dispatches the events still queued. """
+        self._stopped.set()
+        self._batch_ready.set()
+        self.executor.join(self._STOP_TIMEOUT)
+        if self.executor.is_alive():
+            self.logger.error(f'Timeout exceeded while attempting to stop for {self._STOP_TIMEOUT} seconds.')
+
+        atexit.unregister(self.flush)
+        self.flush()
+
+    def flush(self) -> None:
+        """ Dispatches all queued events, batch_size events at a time. """
+        with self._flush_lock:
+            while True:
+                batch: list[event_builder.Event] = []
+                try:
+                    while len(batch) < self.batch_size:
+                        batch.append(self.event_queue.get_nowait())
+                except queue.Empty:
+                    pass
+
+                if not batch:
+                    return
+
+                for event in _merge_events(batch):
+                    try:
+                        self.event_dispatcher.dispatch_event(event)
+                    except Exception as e:
+                        self.logger.error(f'Error dispatching event: {event} {e}')
+
+
+def _merge_events(events: list[event_builder.Event]) -> list[event_builder.Event]:
+    """ Merges events sent to the same URL with the same headers and batch properties by
+    concatenating their visitors. Other events are returned unchanged.
+
+    Args:
+      events: Events to merge.
+
+    Returns:
+      Merged events in the order their first event was received.
+    """
+    groups: dict[Hashable, list[event_builder.Event]] = {}
+
+    for event in events:
+        params = event.params
+        key: Hashable = object()
+        if event.http_verb == HTTPVerbs.POST and isinstance(params, dict) and isinstance(params.get('visitors'), list):
+            try:
+                key = (
+                    event.url,
+                    tuple(sorted(event.headers.items())) if event.headers else None,
+                    tuple(sorted((name, value) for name, value in params.items() if name != 'visitors')),
+                )
+                hash(key)
+            except TypeError:
+                # batch properties that cannot be compared, the event is sent on its own
+                key = object()
+
+        groups.setdefault(key, []).append(event)
+
+    merged = []
+    for group in groups.values():
+        first = group[0]
+        if len(group) == 1:
+            merged.append(first)
+            continue
+
+        visitors = [visitor for event in group for visitor in event.params['visitors']]
+        merged.append(event_builder.Event(
+            first.url, {**first.params, 'visitors': visitors}, first.http_verb, first.headers
+        ))
+
+    return merged
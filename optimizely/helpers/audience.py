@@ -32,7 +32,9 @@ def does_user_meet_audience_conditions(
     audience_logs: Type[ExperimentAudienceEvaluationLogs | RolloutRuleAudienceEvaluationLogs],
     logging_key: str,
     user_context: optimizely_user_context.OptimizelyUserContext,
-    logger: Logger
+    logger: Logger,
+    audience_results: Optional[dict[str, Optional[bool]]] = None,
+    build_messages: bool = True
 ) -> tuple[bool, list[str]]:
     """ Determine for given experiment if user satisfies the audiences for the experiment.
 
@@ -44,24 +46,38 @@ def does_user_meet_audience_conditions(
         attributes: Dict representing user attributes which will be used in determining
                     if the audience conditions are met. If not provided, default to an empty dict.
         logger: Provides a logger to send log messages to.
+        audience_results: Optional dict of audience results of the user by audience ID. Audiences found in it
+                          are not evaluated again and evaluated audiences are added to it.
+        build_messages: Whether log messages and decision reasons are built. When False nothing is logged
+                        and no reasons are returned, for callers which neither log nor return them.
 
     Returns:
         Boolean representing if user satisfies audience conditions for any of the audiences or not
         And an array of log messages representing decision making.
     """
     decide_reasons = []
-    message = audience_logs.EVALUATING_AUDIENCES_COMBINED.format(logging_key, json.dumps(audience_conditions))
-    logger.debug(message)
-    decide_reasons.append(message)
 
-    # Return True in case there are no audiences
+    # Return True in case there are no audiences, without serializing or walking the conditions.
+    # This is the common case for "Everyone Else" rollout rules.
     if audience_conditions is None or audience_conditions == []:
-        message = audience_logs.AUDIENCE_EVALUATION_RESULT_COMBINED.format(logging_key, 'TRUE')
-        logger.info(message)
-        decide_reasons.append(message)
+        if build_messages:
+            message = audience_logs.EVALUATING_AUDIENCES_COMBINED.format(
+                logging_key, 'null' if audience_conditions is None else '[]'
+            )
+            logger.debug(message)
+            decide_reasons.append(message)
+
+            message = audience_logs.AUDIENCE_EVALUATION_RESULT_COMBINED.format(logging_key, 'TRUE')
+            logger.info(message)
+            decide_reasons.append(message)
 
         return True, decide_reasons
 
+    if build_messages:
+        message = audience_logs.EVALUATING_AUDIENCES_COMBINED.format(logging_key, json.dumps(audience_conditions))
+        logger.debug(message)
+        decide_reasons.append(message)
+
     def evaluate_custom_attr(audience_id: str, index: int) -> Optional[bool]:
         audience = config.get_audience(audience_id)
         if not audience or audience.conditionList is None:
@@ -73,26 +89,35 @@ def does_user_meet_audience_conditions(
         return custom_attr_condition_evaluator.evaluate(index)
 
     def evaluate_audience(audience_id: str) -> Optional[bool]:
+        if audience_results is not None and audience_id in audience_results:
+            return audience_results[audience_id]
+
         audience = config.get_audience(audience_id)
 
         if audience is None:
             return None
-        _message = audience_logs.EVALUATING_AUDIENCE.format(audience_id, audience.conditions)
-        logger.debug(_message)
+        if build_messages:
+            _message = audience_logs.EVALUATING_AUDIENCE.format(audience_id, audience.conditions)
+            logger.debug(_message)
 
         result = condition_tree_evaluator.evaluate(
             audience.conditionStructure, lambda index: evaluate_custom_attr(audience_id, index),
         )
 
-        result_str = str(result).upper() if result is not None else 'UNKNOWN'
-        _message = audience_logs.AUDIENCE_EVALUATION_RESULT.format(audience_id, result_str)
-        logger.debug(_message)
+        if build_messages:
+            result_str = str(result).upper() if result is not None else 'UNKNOWN'
+            _message = audience_logs.AUDIENCE_EVALUATION_RESULT.format(audience_id, result_str)
+            logger.debug(_message)
+
+        if audience_results is not None:
+            audience_results[audience_id] = result
 
         return result
 
     eval_result = condition_tree_evaluator.evaluate(audience_conditions, evaluate_audience)
     eval_result = eval_result or False
-    message = audience_logs.AUDIENCE_EVALUATION_RESULT_COMBINED.format(logging_key, str(eval_result).upper())
-    logger.info(message)
-    decide_reasons.append(message)
+    if build_messages:
+        message = audience_logs.AUDIENCE_EVALUATION_RESULT_COMBINED.format(logging_key, str(eval_result).upper())
+        logger.info(message)
+        decide_reasons.append(message)
     return eval_result, decide_reasons
@@ -146,6 +146,7 @@ class ForcedDecisionLogs:
 
 class HTTPHeaders:
     AUTHORIZATION: Final = 'Authorization'
+    CONTENT_TYPE: Final = 'Content-Type'
     IF_MODIFIED_SINCE: Final = 'If-Modified-Since'
     LAST_MODIFIED: Final = 'Last-Modified'
 
@@ -199,6 +200,9 @@ class EventDispatchConfig:
     """Event dispatching configs."""
     REQUEST_TIMEOUT: Final = 10
     RETRIES: Final = 3
+    CIRCUIT_FAILURE_THRESHOLD: Final = 5
+    CIRCUIT_RECOVERY_TIMEOUT: Final = 30
+    MAX_CONCURRENT_REQUESTS: Final = 16
 
 
 class OdpEventApiConfig:
@@ -33,7 +33,8 @@ class OptimizelySdkSettings:
             odp_event_manager: Optional[OdpEventManager] = None,
             odp_segment_request_timeout: Optional[int] = None,
             odp_event_request_timeout: Optional[int] = None,
-            odp_event_flush_interval: Optional[int] = None
+            odp_event_flush_interval: Optional[int] = None,
+            decision_cache_size: int = 0
     ) -> None:
         """
         Args:
@@ -52,6 +53,9 @@ class OptimizelySdkSettings:
             send successfully (optional).
           odp_event_request_timeout: Time to wait in seconds for send_odp_events request to send successfully.
           odp_event_flush_interval: Time to wait for events to accumulate before sending a batch in seconds (optional).
+          decision_cache_size: The maximum number of flag decisions cached per user, attributes and segments for
+            the current datafile revision (optional. default = 0). Decisions are not cached when a user profile
+            service is used or the user has forced decisions or forced variations. Set to zero to disable caching.
         """
 
         self.odp_disabled = odp_disabled
@@ -63,3 +67,4 @@ class OptimizelySdkSettings:
         self.fetch_segments_timeout = odp_segment_request_timeout
         self.odp_event_timeout = odp_event_request_timeout
         self.odp_flush_interval = odp_event_flush_interval
+        self.decision_cache_size = decision_cache_size
@@ -140,3 +140,39 @@ def adapt_logger(logger: Logger) -> Logger:
 
     # Otherwise, return whatever we were given because we can't adapt.
     return logger
+
+
+def is_debug_enabled(logger: Logger) -> bool:
+    """
+  Check whether debug messages sent to the given logger would be emitted.
+
+  Only standard python loggers can report this, any other logger is assumed to emit debug messages.
+
+  Args:
+    logger: Possibly a logger.BaseLogger, or a standard python logging.Logger.
+
+  Returns: False if the logger is known to discard debug messages, True otherwise.
+
+  """
+    if isinstance(logger, logging.Logger):
+        return logger.isEnabledFor(logging.DEBUG)
+
+    return True
+
+
+def is_info_enabled(logger: Logger) -> bool:
+    """
+  Check whether info messages sent to the given logger would be emitted.
+
+  Only standard python loggers can report this, any other logger is assumed to emit info messages.
+
+  Args:
+    logger: Possibly a logger.BaseLogger, or a standard python logging.Logger.
+
+  Returns: False if the logger is known to discard info messages, True otherwise.
+
+  """
+    if isinstance(logger, logging.Logger):
+        return logger.isEnabledFor(logging.INFO)
+
+    return True
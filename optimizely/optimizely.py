@@ -169,7 +169,9 @@ class Optimizely:
         self._setup_odp(self.config_manager.get_sdk_key())
 
         self.event_builder = event_builder.EventBuilder()
-        self.decision_service = decision_service.DecisionService(self.logger, user_profile_service)
+        self.decision_service = decision_service.DecisionService(
+            self.logger, user_profile_service, self.sdk_settings.decision_cache_size
+        )
         self.user_profile_service = user_profile_service
 
     def _validate_instantiation_options(self) -> None:
@@ -1303,6 +1305,11 @@ class Optimizely:
 
         if project_config is None:
             return decisions
+
+        # forced decision messages are only built when they are logged or returned as reasons
+        build_messages = (
+            OptimizelyDecideOption.INCLUDE_REASONS in merged_decide_options or _logging.is_info_enabled(self.logger)
+        )
         for key in keys:
             feature_flag = project_config.feature_key_map.get(key)
             if feature_flag is None:
@@ -1312,10 +1319,11 @@ class Optimizely:
             decision_reasons: list[str] = []
             decision_reasons_dict[key] = decision_reasons
 
-            optimizely_decision_context = OptimizelyUserContext.OptimizelyDecisionContext(flag_key=key, rule_key=None)
+            optimizely_decision_context = decision_service._get_decision_context(key)
             forced_decision_response = self.decision_service.validated_forced_decision(project_config,
                                                                                        optimizely_decision_context,
-                                                                                       user_context)
+                                                                                       user_context,
+                                                                                       build_messages)
             variation, decision_reasons = forced_decision_response
             decision_reasons_dict[key] += decision_reasons
 
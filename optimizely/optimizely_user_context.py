@@ -79,19 +79,46 @@ class OptimizelyUserContext:
         """ Using class with attributes here instead of namedtuple because
             class is extensible, it's easy to add another attribute if we wanted
             to extend decision context.
+            Slots are used since decision contexts are looked up on every decision, and the
+            hash is computed once and kept until the flag or rule key is set again.
         """
+        __slots__ = ('_flag_key', '_rule_key', '_hash')
+
         def __init__(self, flag_key: str, rule_key: Optional[str] = None):
-            self.flag_key = flag_key
-            self.rule_key = rule_key
+            self._flag_key = flag_key
+            self._rule_key = rule_key
+            self._hash: Optional[int] = None
+
+        @property
+        def flag_key(self) -> str:
+            return self._flag_key
+
+        @flag_key.setter
+        def flag_key(self, flag_key: str) -> None:
+            self._flag_key = flag_key
+            self._hash = None
+
+        @property
+        def rule_key(self) -> Optional[str]:
+            return self._rule_key
+
+        @rule_key.setter
+        def rule_key(self, rule_key: Optional[str]) -> None:
+            self._rule_key = rule_key
+            self._hash = None
 
         def __hash__(self) -> int:
-            return hash((self.flag_key, self.rule_key))
+            if self._hash is None:
+                self._hash = hash((self._flag_key, self._rule_key))
+            return self._hash
 
         def __eq__(self, other: OptimizelyUserContext.OptimizelyDecisionContext) -> bool:  # type: ignore[override]
             return (self.flag_key, self.rule_key) == (other.flag_key, other.rule_key)
 
     # forced decision
     class OptimizelyForcedDecision:
+        __slots__ = ('variation_key',)
+
         def __init__(self, variation_key: str):
             self.variation_key = variation_key
 
@@ -222,6 +249,26 @@ class OptimizelyUserContext:
         forced_decision = self.find_forced_decision(decision_context)
         return forced_decision
 
+    def get_forced_decisions_for_flag(self, flag_key: str) -> dict[Optional[str], OptimizelyForcedDecision]:
+        """
+        Gets all forced decisions set for a given flag.
+
+        Args:
+            flag_key: a flag key.
+
+        Returns:
+            Dictionary of rule keys to forced decisions, the flag level forced decision is keyed by None.
+        """
+        with self.lock:
+            if not self.forced_decisions_map:
+                return {}
+
+            return {
+                decision_context.rule_key: forced_decision
+                for decision_context, forced_decision in self.forced_decisions_map.items()
+                if decision_context.flag_key == flag_key
+            }
+
     def remove_forced_decision(self, decision_context: OptimizelyDecisionContext) -> bool:
         """
         Removes the forced decision for a given decision context.
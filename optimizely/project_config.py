@@ -107,9 +107,12 @@ class ProjectConfig:
         self.audience_id_map.update(typed_audience_id_map)
 
         self.rollout_id_map = self._generate_key_map(self.rollouts, 'id', entities.Layer)
+        # Dictionary containing the ordered targeting rules of each rollout, keyed by rollout ID.
+        self.rollout_experiments_map: dict[str, list[entities.Experiment]] = {}
         for layer in self.rollout_id_map.values():
-            for experiment_dict in layer.experiments:
-                self.experiment_id_map[experiment_dict['id']] = entities.Experiment(**experiment_dict)
+            rollout_experiments_id_map = self._generate_key_map(layer.experiments, 'id', entities.Experiment)
+            self.experiment_id_map.update(rollout_experiments_id_map)
+            self.rollout_experiments_map[layer.id] = list(rollout_experiments_id_map.values())
 
         if self.integrations:
             self.integration_key_map = self._generate_key_map(
@@ -242,8 +245,10 @@ class ProjectConfig:
             Mapped rollout experiments.
         """
 
-        rollout_experiments_id_map = self._generate_key_map(rollout.experiments, 'id', entities.Experiment)
-        rollout_experiments = [experiment for experiment in rollout_experiments_id_map.values()]
+        rollout_experiments = self.rollout_experiments_map.get(rollout.id)
+        if rollout_experiments is None:
+            rollout_experiments_id_map = self._generate_key_map(rollout.experiments, 'id', entities.Experiment)
+            rollout_experiments = list(rollout_experiments_id_map.values())
 
         return rollout_experiments
 
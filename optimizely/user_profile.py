@@ -60,7 +60,11 @@ class UserProfile:
     Returns:
       Variation ID corresponding to the experiment. None if no decision available.
     """
-        return self.experiment_bucket_map.get(experiment_id, {self.VARIATION_ID_KEY: None}).get(self.VARIATION_ID_KEY)
+        experiment_bucket = self.experiment_bucket_map.get(experiment_id)
+        if not experiment_bucket:
+            return None
+
+        return experiment_bucket.get(self.VARIATION_ID_KEY)
 
     def save_variation_for_experiment(self, experiment_id: str, variation_id: str) -> None:
         """ Helper method to save new experiment/variation as part of the user's profile.
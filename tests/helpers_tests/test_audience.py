@@ -78,6 +78,85 @@ class AudienceTest(base.BaseTest):
             user_meets_audience_conditions
         )
 
+    def test_does_user_meet_audience_conditions__no_audience_skips_evaluation(self):
+        """ Test that does_user_meet_audience_conditions does not serialize or evaluate empty audience conditions,
+        and still reports the same reasons. """
+
+        for audience_conditions, serialized_conditions in (([], '[]'), (None, 'null')):
+            with mock.patch('optimizely.helpers.condition_tree_evaluator.evaluate') as cond_tree_eval, \
+                    mock.patch('json.dumps') as mock_json_dumps:
+                user_meets_audience_conditions, reasons = audience.does_user_meet_audience_conditions(
+                    self.project_config,
+                    audience_conditions,
+                    enums.RolloutRuleAudienceEvaluationLogs,
+                    'Everyone Else',
+                    self.user_context,
+                    self.mock_client_logger
+                )
+
+            self.assertStrictTrue(user_meets_audience_conditions)
+            cond_tree_eval.assert_not_called()
+            mock_json_dumps.assert_not_called()
+            self.assertEqual(
+                [
+                    f'Evaluating audiences for rule Everyone Else: {serialized_conditions}.',
+                    'Audiences for rule Everyone Else collectively evaluated to TRUE.',
+                ],
+                reasons,
+            )
+
+    def test_does_user_meet_audience_conditions__without_messages(self):
+        """ Test that does_user_meet_audience_conditions neither builds nor logs messages
+        when build_messages is False. """
+
+        self.user_context._user_attributes = {'test_attribute': 'test_value_1'}
+
+        with mock.patch('json.dumps') as mock_dumps:
+            for audience_conditions, expected_result in ((['11154'], True), ([], True), (['11159'], False)):
+                user_meets_audience_conditions, reasons = audience.does_user_meet_audience_conditions(
+                    self.project_config,
+                    audience_conditions,
+                    enums.ExperimentAudienceEvaluationLogs,
+                    'test_experiment',
+                    self.user_context,
+                    self.mock_client_logger,
+                    build_messages=False
+                )
+                self.assertIs(expected_result, user_meets_audience_conditions)
+                self.assertEqual([], reasons)
+
+        mock_dumps.assert_not_called()
+        self.mock_client_logger.debug.assert_not_called()
+        self.mock_client_logger.info.assert_not_called()
+
+    def test_does_user_meet_audience_conditions__reuses_audience_results(self):
+        """ Test that does_user_meet_audience_conditions evaluates each audience once
+        when given audience results. """
+
+        self.user_context._user_attributes = {'test_attribute': 'test_value_1'}
+        audience_results = {}
+
+        with mock.patch.object(
+                self.project_config, 'get_audience', wraps=self.project_config.get_audience
+        ) as mock_get_audience:
+            for logging_key in ('test_experiment', 'test_experiment_2'):
+                user_meets_audience_conditions, _ = audience.does_user_meet_audience_conditions(
+                    self.project_config,
+                    ['11154'],
+                    enums.ExperimentAudienceEvaluationLogs,
+                    logging_key,
+                    self.user_context,
+                    self.mock_client_logger,
+                    audience_results=audience_results
+                )
+                self.assertStrictTrue(user_meets_audience_conditions)
+
+        self.assertEqual({'11154': True}, audience_results)
+        self.assertEqual(
+            [mock.call('11154')] * 2,
+            mock_get_audience.call_args_list,
+        )
+
     def test_does_user_meet_audience_conditions__with_audience(self):
         """ Test that does_user_meet_audience_conditions evaluates non-empty audience.
         Test that does_user_meet_audience_conditions uses not None audienceConditions and ignores audienceIds.
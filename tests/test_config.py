@@ -929,6 +929,19 @@ class ConfigTest(base.BaseTest):
 
         mock_config_logging.error.assert_called_once_with('Rollout with ID "aabbccdd" is not in datafile.')
 
+    def test_get_rollout_experiments__returns_resolved_experiments(self):
+        """ Test that rollout experiments are returned in order and are the experiments held by the config. """
+
+        opt_obj = optimizely.Optimizely(json.dumps(self.config_dict_with_features))
+        project_config = opt_obj.config_manager.get_config()
+        rollout = project_config.get_rollout_from_id('211111')
+
+        rollout_experiments = project_config.get_rollout_experiments(rollout)
+
+        self.assertEqual(['211127', '211137', '211147'], [experiment.id for experiment in rollout_experiments])
+        for experiment in rollout_experiments:
+            self.assertIs(project_config.get_experiment_from_id(experiment.id), experiment)
+
     def test_get_variable_value_for_variation__returns_valid_value(self):
         """ Test that the right value is returned. """
         opt_obj = optimizely.Optimizely(json.dumps(self.config_dict_with_features))
@@ -12,14 +12,17 @@
 # limitations under the License.
 
 import json
+import logging
 
 from unittest import mock
 
 from optimizely import decision_service
 from optimizely import entities
+from optimizely import logger as _logging
 from optimizely import optimizely
 from optimizely import optimizely_user_context
 from optimizely import user_profile
+from optimizely.decision.optimizely_decide_option import OptimizelyDecideOption
 from optimizely.helpers import enums
 from . import base
 
@@ -31,6 +34,18 @@ class DecisionServiceTest(base.BaseTest):
         # Set UserProfileService for the purposes of testing
         self.decision_service.user_profile_service = user_profile.UserProfileService()
 
+    def test_get_decision_context__reuses_instances(self):
+        """ Test that _get_decision_context returns one shared instance per flag key and rule key. """
+
+        context = decision_service._get_decision_context("test_feature", "test_rule")
+        self.assertEqual(
+            optimizely_user_context.OptimizelyUserContext.OptimizelyDecisionContext("test_feature", "test_rule"),
+            context,
+        )
+        self.assertIs(context, decision_service._get_decision_context("test_feature", "test_rule"))
+        self.assertIsNot(context, decision_service._get_decision_context("test_feature"))
+        self.assertIsNone(decision_service._get_decision_context("test_feature").rule_key)
+
     def test_get_bucketing_id__no_bucketing_id_attribute(self):
         """ Test that _get_bucketing_id returns correct bucketing ID when there is no bucketing ID attribute. """
 
@@ -277,12 +292,35 @@ class DecisionServiceTest(base.BaseTest):
             'Nothing to remove. Variation mapped to experiment "group_exp_1" for user "test_user" does not exist.'
         )
 
+    def test_set_forced_variation__replaces_maps_instead_of_mutating(self):
+        """ Test that set_forced_variation leaves maps already read by a decision untouched. """
+        forced_variation_map = self.decision_service.forced_variation_map
+        forced_variation_users = self.decision_service.forced_variation_users
+
+        self.assertTrue(
+            self.decision_service.set_forced_variation(
+                self.project_config, "test_experiment", "test_user", "variation"
+            )
+        )
+        self.assertEqual({}, forced_variation_map)
+        self.assertEqual({}, forced_variation_users)
+        self.assertEqual({("test_user", "111127"): "111129"}, self.decision_service.forced_variation_map)
+        self.assertEqual({"test_user": 1}, self.decision_service.forced_variation_users)
+
+        forced_variation_map = self.decision_service.forced_variation_map
+        self.assertTrue(
+            self.decision_service.set_forced_variation(
+                self.project_config, "test_experiment", "test_user", None
+            )
+        )
+        self.assertEqual({("test_user", "111127"): "111129"}, forced_variation_map)
+        self.assertEqual({}, self.decision_service.forced_variation_map)
+        self.assertEqual({"test_user": 0}, self.decision_service.forced_variation_users)
+
     def test_get_forced_variation__invalid_user_id(self):
         """ Test invalid user IDs return a null variation. """
-        self.decision_service.forced_variation_map["test_user"] = {}
-        self.decision_service.forced_variation_map["test_user"][
-            "test_experiment"
-        ] = "test_variation"
+        self.decision_service.forced_variation_map[("test_user", "test_experiment")] = "test_variation"
+        self.decision_service.forced_variation_users["test_user"] = 1
 
         variation, _ = self.decision_service.get_forced_variation(
             self.project_config, "test_experiment", None
@@ -299,10 +337,8 @@ class DecisionServiceTest(base.BaseTest):
 
     def test_get_forced_variation__invalid_experiment_key(self):
         """ Test invalid experiment keys return a null variation. """
-        self.decision_service.forced_variation_map["test_user"] = {}
-        self.decision_service.forced_variation_map["test_user"][
-            "test_experiment"
-        ] = "test_variation"
+        self.decision_service.forced_variation_map[("test_user", "test_experiment")] = "test_variation"
+        self.decision_service.forced_variation_users["test_user"] = 1
         variation, _ = self.decision_service.get_forced_variation(
             self.project_config, "test_experiment_not_in_datafile", "test_user"
         )
@@ -324,8 +360,12 @@ class DecisionServiceTest(base.BaseTest):
 
     def test_get_forced_variation_with_none_set_for_user(self):
         """ Test get_forced_variation when none set for user ID in forced variation map. """
-        self.decision_service.forced_variation_map = {}
-        self.decision_service.forced_variation_map["test_user"] = {}
+        self.decision_service.set_forced_variation(
+            self.project_config, "test_experiment", "test_user", "variation"
+        )
+        self.decision_service.set_forced_variation(
+            self.project_config, "test_experiment", "test_user", None
+        )
 
         with mock.patch.object(
                 self.decision_service, "logger"
@@ -340,13 +380,26 @@ class DecisionServiceTest(base.BaseTest):
             'No experiment "test_experiment" mapped to user "test_user" in the forced variation map.'
         )
 
+    def test_get_forced_variation__returns_new_reasons_list(self):
+        """ Test that get_forced_variation returns reasons the caller can add to when there are none. """
+
+        variation, reasons = self.decision_service.get_forced_variation(
+            self.project_config, "test_experiment", "test_user"
+        )
+        self.assertIsNone(variation)
+
+        reasons.append('note')
+        self.assertEqual(['note'], reasons)
+        _, other_reasons = self.decision_service.get_forced_variation(
+            self.project_config, "test_experiment", "test_user"
+        )
+        self.assertEqual([], other_reasons)
+
     def test_get_forced_variation_missing_variation_mapped_to_experiment(self):
         """ Test get_forced_variation when no variation found against given experiment for the user. """
-        self.decision_service.forced_variation_map = {}
-        self.decision_service.forced_variation_map["test_user"] = {}
-        self.decision_service.forced_variation_map["test_user"][
-            "test_experiment"
-        ] = None
+        self.decision_service.set_forced_variation(
+            self.project_config, "group_exp_1", "test_user", "group_exp_1_variation"
+        )
 
         with mock.patch.object(
                 self.decision_service, "logger"
@@ -639,7 +692,9 @@ class DecisionServiceTest(base.BaseTest):
             enums.ExperimentAudienceEvaluationLogs,
             "test_experiment",
             user,
-            mock_decision_service_logging
+            mock_decision_service_logging,
+            audience_results=None,
+            build_messages=True
         )
         mock_bucket.assert_called_once_with(
             self.project_config, experiment, "test_user", "test_user"
@@ -689,7 +744,9 @@ class DecisionServiceTest(base.BaseTest):
             enums.ExperimentAudienceEvaluationLogs,
             "test_experiment",
             user,
-            mock_decision_service_logging
+            mock_decision_service_logging,
+            audience_results=None,
+            build_messages=True
         )
         self.assertEqual(0, mock_bucket.call_count)
         self.assertEqual(0, mock_save.call_count)
@@ -742,7 +799,9 @@ class DecisionServiceTest(base.BaseTest):
             enums.ExperimentAudienceEvaluationLogs,
             "test_experiment",
             user,
-            mock_decision_service_logging
+            mock_decision_service_logging,
+            audience_results=None,
+            build_messages=True
         )
         mock_bucket.assert_called_once_with(
             self.project_config, experiment, "test_user", "test_user"
@@ -786,6 +845,19 @@ class FeatureFlagDecisionTests(base.BaseTest):
         # Assert no log messages were generated
         self.assertEqual(0, mock_logging.call_count)
 
+    def test_get_variation_for_rollout__returns_new_reasons_list(self):
+        """ Test that get_variation_for_rollout returns reasons the caller can add to when there are none. """
+
+        user = optimizely_user_context.OptimizelyUserContext(optimizely_client=None,
+                                                             logger=None,
+                                                             user_id="test_user",
+                                                             user_attributes={})
+
+        _, reasons = self.decision_service.get_variation_for_rollout(self.project_config, None, user)
+
+        reasons.append('note')
+        self.assertEqual(['note'], reasons)
+
     def test_get_variation_for_rollout__returns_decision_if_user_in_rollout(self):
         """ Test that get_variation_for_rollout returns Decision with experiment/variation
      if user meets targeting conditions for a rollout rule. """
@@ -907,6 +979,8 @@ class FeatureFlagDecisionTests(base.BaseTest):
                     '1',
                     user,
                     mock_decision_service_logging,
+                    audience_results=None,
+                    build_messages=True,
                 ),
                 mock.call(
                     self.project_config,
@@ -915,6 +989,8 @@ class FeatureFlagDecisionTests(base.BaseTest):
                     'Everyone Else',
                     user,
                     mock_decision_service_logging,
+                    audience_results=None,
+                    build_messages=True,
                 ),
             ],
             mock_audience_check.call_args_list,
@@ -930,6 +1006,43 @@ class FeatureFlagDecisionTests(base.BaseTest):
             ]
         )
 
+    def test_get_variation_for_rollout__resolves_bucketing_id_once(self):
+        """ Test that get_variation_for_rollout resolves the bucketing ID once per rollout
+        and records its reasons only once, ahead of the first rule's audience reasons. """
+
+        user = optimizely_user_context.OptimizelyUserContext(optimizely_client=None,
+                                                             logger=None,
+                                                             user_id="test_user",
+                                                             user_attributes={"$opt_bucketing_id": 5})
+        feature = self.project_config.get_feature_from_key("test_feature_in_rollout")
+
+        with mock.patch(
+                "optimizely.helpers.audience.does_user_meet_audience_conditions", return_value=[False, []]
+        ), self.mock_decision_logger as mock_decision_service_logging, mock.patch.object(
+            self.decision_service, "_get_bucketing_id", wraps=self.decision_service._get_bucketing_id
+        ) as mock_get_bucketing_id:
+            variation_received, reasons = self.decision_service.get_variation_for_rollout(
+                self.project_config, feature, user
+            )
+            self.assertEqual(
+                decision_service.Decision(None, None, enums.DecisionSources.ROLLOUT),
+                variation_received,
+            )
+
+        mock_get_bucketing_id.assert_called_once_with("test_user", {"$opt_bucketing_id": 5})
+        mock_decision_service_logging.warning.assert_called_once_with(
+            "Bucketing ID attribute is not a string. Defaulted to user_id."
+        )
+        self.assertEqual(
+            [
+                'Bucketing ID attribute is not a string. Defaulted to user_id.',
+                'User "test_user" does not meet audience conditions for targeting rule 1.',
+                'User "test_user" does not meet audience conditions for targeting rule 2.',
+                'User "test_user" does not meet audience conditions for targeting rule Everyone Else.',
+            ],
+            reasons,
+        )
+
     def test_get_variation_for_rollout__returns_none_for_user_not_in_rollout(self):
         """ Test that get_variation_for_rollout returns None for the user not in the associated rollout. """
 
@@ -960,6 +1073,8 @@ class FeatureFlagDecisionTests(base.BaseTest):
                     "1",
                     user,
                     mock_decision_service_logging,
+                    audience_results=None,
+                    build_messages=True,
                 ),
                 mock.call(
                     self.project_config,
@@ -968,6 +1083,8 @@ class FeatureFlagDecisionTests(base.BaseTest):
                     "2",
                     user,
                     mock_decision_service_logging,
+                    audience_results=None,
+                    build_messages=True,
                 ),
                 mock.call(
                     self.project_config,
@@ -976,6 +1093,8 @@ class FeatureFlagDecisionTests(base.BaseTest):
                     "Everyone Else",
                     user,
                     mock_decision_service_logging,
+                    audience_results=None,
+                    build_messages=True,
                 ),
             ],
             mock_audience_check.call_args_list,
@@ -1034,7 +1153,9 @@ class FeatureFlagDecisionTests(base.BaseTest):
             user,
             None,
             [],
-            None
+            None,
+            audience_results={},
+            build_messages=True
         )
 
     def test_get_variation_for_feature__returns_variation_for_feature_in_rollout(self):
@@ -1065,13 +1186,217 @@ class FeatureFlagDecisionTests(base.BaseTest):
             )
 
         mock_get_variation_for_rollout.assert_called_once_with(
-            self.project_config, feature, user
+            self.project_config, feature, user, audience_results={}, reasons=decision_service._NULL_REASONS,
+            build_messages=True
         )
 
         # Assert no log messages were generated
         self.assertEqual(1, mock_decision_service_logging.debug.call_count)
         self.assertEqual(1, len(mock_decision_service_logging.method_calls))
 
+    def test_get_variations_for_feature_list__collects_reasons_only_when_included(self):
+        """ Test that get_variations_for_feature_list only returns reasons with the INCLUDE_REASONS option. """
+
+        user = optimizely_user_context.OptimizelyUserContext(optimizely_client=None,
+                                                             logger=None,
+                                                             user_id="test_user",
+                                                             user_attributes={})
+        features = [
+            self.project_config.get_feature_from_key("test_feature_in_experiment"),
+            self.project_config.get_feature_from_key("test_feature_in_rollout"),
+        ]
+
+        with self.mock_decision_logger:
+            decisions = self.decision_service.get_variations_for_feature_list(self.project_config, features, user)
+            decisions_with_reasons = self.decision_service.get_variations_for_feature_list(
+                self.project_config, features, user, [OptimizelyDecideOption.INCLUDE_REASONS]
+            )
+
+        self.assertEqual([decision for decision, _ in decisions_with_reasons], [decision for decision, _ in decisions])
+        for _, reasons in decisions:
+            self.assertEqual([], reasons)
+        for _, reasons in decisions_with_reasons:
+            self.assertNotEqual([], reasons)
+
+    def test_get_variations_for_feature_list__shared_empty_reasons_stay_empty(self):
+        """ Test that reasons returned without INCLUDE_REASONS cannot be filled by callers. """
+
+        user = optimizely_user_context.OptimizelyUserContext(optimizely_client=None,
+                                                             logger=None,
+                                                             user_id="test_user",
+                                                             user_attributes={})
+        feature = self.project_config.get_feature_from_key("test_feature_in_rollout")
+
+        with self.mock_decision_logger:
+            _, reasons = self.decision_service.get_variations_for_feature_list(self.project_config, [feature], user)[0]
+
+        reasons += ['leaked']
+        reasons.append('leaked')
+        reasons.extend(['leaked'])
+        reasons.insert(0, 'leaked')
+        reasons[:] = ['leaked']
+        reasons *= 2
+
+        self.assertEqual([], reasons)
+        self.assertEqual([], decision_service._NULL_REASONS)
+
+    def test_get_variations_for_feature_list__discards_reasons_of_rules_when_not_requested(self):
+        """ Test that get_variations_for_feature_list passes the shared empty reasons to the decisions
+        of experiments and rollouts when INCLUDE_REASONS is not given. """
+
+        user = optimizely_user_context.OptimizelyUserContext(optimizely_client=None,
+                                                             logger=None,
+                                                             user_id="test_user",
+                                                             user_attributes={"test_attribute": "test_value_1"})
+        features = [
+            self.project_config.get_feature_from_key("test_feature_in_experiment"),
+            self.project_config.get_feature_from_key("test_feature_in_rollout"),
+        ]
+
+        with self.mock_decision_logger, mock.patch.object(
+                self.decision_service, "get_variation", wraps=self.decision_service.get_variation
+        ) as mock_get_variation, mock.patch.object(
+                self.decision_service, "get_variation_for_rollout",
+                wraps=self.decision_service.get_variation_for_rollout
+        ) as mock_get_variation_for_rollout:
+            decisions = self.decision_service.get_variations_for_feature_list(self.project_config, features, user)
+
+        self.assertTrue(mock_get_variation.called)
+        for call in mock_get_variation.call_args_list:
+            self.assertIs(decision_service._NULL_REASONS, call[0][4])
+        self.assertTrue(mock_get_variation_for_rollout.called)
+        for call in mock_get_variation_for_rollout.call_args_list:
+            self.assertIs(decision_service._NULL_REASONS, call[1]['reasons'])
+        for _, reasons in decisions:
+            self.assertIs(decision_service._NULL_REASONS, reasons)
+
+    def test_get_variations_for_feature_list__builds_messages_only_when_logged_or_requested(self):
+        """ Test that get_variations_for_feature_list only builds the messages of rules when the logger
+        emits them or INCLUDE_REASONS is given. """
+
+        user = optimizely_user_context.OptimizelyUserContext(optimizely_client=None,
+                                                             logger=None,
+                                                             user_id="test_user",
+                                                             user_attributes={"test_attribute": "test_value_1"})
+        features = [
+            self.project_config.get_feature_from_key("test_feature_in_experiment"),
+            self.project_config.get_feature_from_key("test_feature_in_rollout"),
+        ]
+
+        for level, options, expected_build_messages in (
+            (logging.WARNING, None, False),
+            (logging.WARNING, [OptimizelyDecideOption.INCLUDE_REASONS], True),
+            (logging.INFO, None, True),
+        ):
+            logger = _logging.reset_logger('test_get_variations_for_feature_list', level=level)
+            with mock.patch.object(self.decision_service, "logger", logger), mock.patch(
+                    "optimizely.helpers.audience.does_user_meet_audience_conditions", return_value=(False, [])
+            ) as mock_audience_check:
+                decisions = self.decision_service.get_variations_for_feature_list(
+                    self.project_config, features, user, options
+                )
+
+            self.assertTrue(mock_audience_check.called)
+            for call in mock_audience_check.call_args_list:
+                self.assertIs(expected_build_messages, call[1]["build_messages"])
+            for _, reasons in decisions:
+                self.assertEqual(bool(options), bool(reasons))
+
+    def test_get_variations_for_feature_list__shares_audience_results_across_features(self):
+        """ Test that get_variations_for_feature_list evaluates each audience once for all features
+        of a call and does not reuse audience results across calls. """
+
+        feature = self.project_config.get_feature_from_key("test_feature_in_rollout")
+        audience_lookups = []
+
+        for features in ([feature], [feature, feature]):
+            user = optimizely_user_context.OptimizelyUserContext(optimizely_client=None,
+                                                                 logger=None,
+                                                                 user_id="test_user",
+                                                                 user_attributes={"test_attribute": "test_value_1"})
+            with self.mock_decision_logger, mock.patch(
+                    "optimizely.bucketer.Bucketer.bucket", return_value=[None, []]
+            ), mock.patch.object(
+                self.project_config, "get_audience", wraps=self.project_config.get_audience
+            ) as mock_get_audience:
+                decisions = self.decision_service.get_variations_for_feature_list(self.project_config, features, user)
+
+            self.assertEqual(len(features), len(decisions))
+            audience_lookups.append(mock_get_audience.call_args_list)
+
+        self.assertTrue(audience_lookups[0])
+        self.assertEqual(audience_lookups[0], audience_lookups[1])
+
+    def test_get_variations_for_feature_list__serves_cached_decisions(self):
+        """ Test that get_variations_for_feature_list decides a flag once per user when the decision cache
+        is enabled and decides again when the attributes change. """
+
+        decision_svc = decision_service.DecisionService(mock.MagicMock(), None, decision_cache_size=10)
+        feature = self.project_config.get_feature_from_key("test_feature_in_rollout")
+        user = optimizely_user_context.OptimizelyUserContext(optimizely_client=None,
+                                                             logger=None,
+                                                             user_id="test_user",
+                                                             user_attributes={"test_attribute": "test_value_1"})
+        options = [OptimizelyDecideOption.INCLUDE_REASONS]
+
+        with mock.patch.object(
+                decision_svc, "get_variation_for_rollout", wraps=decision_svc.get_variation_for_rollout
+        ) as mock_get_variation_for_rollout:
+            first_decisions = decision_svc.get_variations_for_feature_list(
+                self.project_config, [feature], user, options)
+            second_decisions = decision_svc.get_variations_for_feature_list(
+                self.project_config, [feature], user, options)
+            self.assertEqual(1, mock_get_variation_for_rollout.call_count)
+
+            user.set_attribute("test_attribute", "test_value_2")
+            decision_svc.get_variations_for_feature_list(self.project_config, [feature], user, options)
+            self.assertEqual(2, mock_get_variation_for_rollout.call_count)
+
+        self.assertEqual(first_decisions, second_decisions)
+        self.assertIsNot(first_decisions[0][1], second_decisions[0][1])
+
+    def test_get_variations_for_feature_list__caches_attribute_values_by_type(self):
+        """ Test that users with equal attribute values of different types (True and 1) do not share
+        cached decisions, as they do not meet the same audience conditions. """
+
+        opt_obj = optimizely.Optimizely(json.dumps(self.config_dict_with_typed_audiences))
+        project_config = opt_obj.config_manager.get_config()
+        decision_svc = decision_service.DecisionService(mock.MagicMock(), None, decision_cache_size=10)
+        feature = project_config.get_feature_from_key("feat")
+
+        decisions = []
+        for should_do_it in (True, 1):
+            user = optimizely_user_context.OptimizelyUserContext(optimizely_client=None,
+                                                                 logger=None,
+                                                                 user_id="test_user",
+                                                                 user_attributes={"should_do_it": should_do_it})
+            decisions.append(decision_svc.get_variations_for_feature_list(project_config, [feature], user)[0][0])
+
+        self.assertEqual("11557362669", decisions[0].variation.key)
+        self.assertIsNone(decisions[1].variation)
+
+    def test_get_variations_for_feature_list__does_not_cache_forced_decisions(self):
+        """ Test that get_variations_for_feature_list does not cache decisions of users with forced decisions. """
+
+        decision_svc = decision_service.DecisionService(mock.MagicMock(), None, decision_cache_size=10)
+        feature = self.project_config.get_feature_from_key("test_feature_in_rollout")
+        user = optimizely_user_context.OptimizelyUserContext(optimizely_client=None,
+                                                             logger=None,
+                                                             user_id="test_user",
+                                                             user_attributes={})
+        user.set_forced_decision(
+            optimizely_user_context.OptimizelyUserContext.OptimizelyDecisionContext("test_feature_in_rollout"),
+            optimizely_user_context.OptimizelyUserContext.OptimizelyForcedDecision("211129")
+        )
+
+        with mock.patch.object(
+                decision_svc, "get_variation_for_rollout", wraps=decision_svc.get_variation_for_rollout
+        ) as mock_get_variation_for_rollout:
+            decision_svc.get_variations_for_feature_list(self.project_config, [feature], user)
+            decision_svc.get_variations_for_feature_list(self.project_config, [feature], user)
+
+        self.assertEqual(2, mock_get_variation_for_rollout.call_count)
+
     def test_get_variation_for_feature__returns_variation_if_user_not_in_experiment_but_in_rollout(
             self,
     ):
@@ -1116,6 +1441,8 @@ class FeatureFlagDecisionTests(base.BaseTest):
             "group_exp_2",
             user,
             mock_decision_service_logging,
+            audience_results={},
+            build_messages=True,
         )
 
         mock_audience_check.assert_any_call(
@@ -1125,6 +1452,8 @@ class FeatureFlagDecisionTests(base.BaseTest):
             "1",
             user,
             mock_decision_service_logging,
+            audience_results={},
+            build_messages=True,
         )
 
     def test_get_variation_for_feature__returns_variation_for_feature_in_group(self):
@@ -1163,7 +1492,9 @@ class FeatureFlagDecisionTests(base.BaseTest):
             user,
             None,
             [],
-            None
+            None,
+            audience_results={},
+            build_messages=False
         )
 
     def test_get_variation_for_feature__returns_none_for_user_not_in_experiment(self):
@@ -1193,7 +1524,9 @@ class FeatureFlagDecisionTests(base.BaseTest):
             user,
             None,
             [],
-            None
+            None,
+            audience_results={},
+            build_messages=False
         )
 
     def test_get_variation_for_feature__returns_none_for_user_in_group_experiment_not_associated_with_feature(
@@ -1220,7 +1553,9 @@ class FeatureFlagDecisionTests(base.BaseTest):
             )
 
         mock_decision.assert_called_once_with(
-            self.project_config, self.project_config.get_experiment_from_id("32222"), user, None, [], False
+            self.project_config, self.project_config.get_experiment_from_id("32222"), user, None, [], False,
+            audience_results={},
+            build_messages=False
         )
 
     def test_get_variation_for_feature__returns_variation_for_feature_in_mutex_group_bucket_less_than_2500(
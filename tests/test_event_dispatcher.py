@@ -12,16 +12,23 @@
 # limitations under the License.
 
 from unittest import mock
+import asyncio
 import json
+import os
+import time
 import unittest
 from requests import exceptions as request_exception
 
 from optimizely import event_builder
 from optimizely import event_dispatcher
+from optimizely.event import log_event
 from optimizely.helpers.enums import EventDispatchConfig
 
 
 class EventDispatcherTest(unittest.TestCase):
+    def setUp(self):
+        event_dispatcher._circuit_breakers.clear()
+
     def test_dispatch_event__get_request(self):
         """ Test that dispatch event fires off requests call with provided URL and params. """
 
@@ -32,7 +39,212 @@ class EventDispatcherTest(unittest.TestCase):
         with mock.patch('requests.Session.get') as mock_request_get:
             event_dispatcher.EventDispatcher.dispatch_event(event)
 
-        mock_request_get.assert_called_once_with(url, params=params, timeout=EventDispatchConfig.REQUEST_TIMEOUT)
+        mock_request_get.assert_called_once_with(
+            'https://www.optimizely.com?a=111001&n=test_event&g=111028&u=oeutest_user',
+            timeout=EventDispatchConfig.REQUEST_TIMEOUT
+        )
+
+    def test_dispatch_event__get_request_appends_to_existing_query(self):
+        """ Test that dispatch event appends the params to a URL which already has a query string. """
+
+        event = event_builder.Event('https://www.optimizely.com?x=1', {'a': '111 001', 'b': ['1', '2']})
+
+        with mock.patch('requests.Session.get') as mock_request_get:
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        mock_request_get.assert_called_once_with(
+            'https://www.optimizely.com?x=1&a=111+001&b=1&b=2', timeout=EventDispatchConfig.REQUEST_TIMEOUT
+        )
+
+    def test_dispatch_event__get_request_keeps_fragment_last(self):
+        """ Test that dispatch event adds the params to the query string of a URL which has a fragment. """
+
+        event = event_builder.Event('https://www.optimizely.com/path?x=1#section', {'a': '111001'})
+
+        with mock.patch('requests.Session.get') as mock_request_get:
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        mock_request_get.assert_called_once_with(
+            'https://www.optimizely.com/path?x=1&a=111001#section', timeout=EventDispatchConfig.REQUEST_TIMEOUT
+        )
+
+    def test_dispatch_event__get_request_leaves_out_none_params(self):
+        """ Test that dispatch event does not send params set to None, alone or in a list, as requests does not. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'a': '111001', 'u': None, 'b': ['1', None, '2']})
+
+        with mock.patch('requests.Session.get') as mock_request_get:
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        mock_request_get.assert_called_once_with(
+            'https://www.optimizely.com?a=111001&b=1&b=2', timeout=EventDispatchConfig.REQUEST_TIMEOUT
+        )
+
+    def test_dispatch_event__reuses_session(self):
+        """ Test that dispatch event sends all events through the same session. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'a': '111001'})
+
+        with mock.patch('requests.Session.get', autospec=True) as mock_request_get:
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        self.assertEqual(2, mock_request_get.call_count)
+        first_session = mock_request_get.call_args_list[0][0][0]
+        self.assertIs(first_session, mock_request_get.call_args_list[1][0][0])
+        self.assertIs(first_session, event_dispatcher._get_session())
+
+    def test_get_session__mounts_adapter(self):
+        """ Test that the event session leaves retries to the dispatcher for HTTP and HTTPS. """
+
+        session = event_dispatcher._get_session()
+
+        adapter = session.get_adapter('https://logx.optimizely.com')
+        self.assertIs(adapter, session.get_adapter('http://logx.optimizely.com'))
+        self.assertEqual(0, adapter.max_retries.total)
+        self.assertEqual(16, adapter._pool_maxsize)
+
+    def test_reset_after_fork__drops_parent_state(self):
+        """ Test that a forked child gets its own session, request slots and circuit breakers. """
+
+        session = event_dispatcher._get_session()
+        bulkhead = event_dispatcher._bulkhead
+        event_dispatcher._get_circuit_breaker('www.optimizely.com').record_failure()
+
+        event_dispatcher._reset_after_fork()
+
+        self.assertIsNot(session, event_dispatcher._get_session())
+        self.assertIsNot(
+            session.get_adapter('https://logx.optimizely.com'),
+            event_dispatcher._get_session().get_adapter('https://logx.optimizely.com')
+        )
+        self.assertIsNot(bulkhead, event_dispatcher._bulkhead)
+        self.assertEqual({}, event_dispatcher._circuit_breakers)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_reset_after_fork__runs_in_forked_child(self):
+        """ Test that the dispatcher state is reset in a child process after fork. """
+
+        session = event_dispatcher._get_session()
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(read_fd)
+                os.write(write_fd, b'1' if event_dispatcher._session is None else b'0')
+            finally:
+                os._exit(0)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd, 'rb') as reader:
+            reset_in_child = reader.read()
+        os.waitpid(pid, 0)
+
+        self.assertEqual(b'1', reset_in_child)
+        self.assertIs(session, event_dispatcher._session)
+
+    def test_dispatch_event__retries_with_jitter(self):
+        """ Test that dispatch event retries connection errors and retryable statuses with jittered backoff. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'a': '111001'})
+        response = mock.Mock(status_code=503)
+
+        with mock.patch('requests.Session.get', side_effect=[
+            request_exception.ConnectionError('Failed Request'),
+            request_exception.HTTPError('Service Unavailable', response=response),
+            mock.Mock(),
+        ]) as mock_request_get, mock.patch('time.sleep') as mock_sleep, \
+                mock.patch('random.uniform', return_value=0.05) as mock_uniform, \
+                mock.patch.object(event_dispatcher.logger, 'error') as mock_log_error:
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        self.assertEqual(3, mock_request_get.call_count)
+        self.assertEqual([mock.call(0, 0.1), mock.call(0, 0.2)], mock_uniform.call_args_list)
+        self.assertEqual([mock.call(0.05), mock.call(0.05)], mock_sleep.call_args_list)
+        mock_log_error.assert_not_called()
+
+    def test_dispatch_event__serializes_post_body_once(self):
+        """ Test that dispatch event reuses the serialized POST body for retries. """
+
+        params = {'accountId': '111001'}
+        event = event_builder.Event('https://www.optimizely.com', params, http_verb='POST')
+
+        with mock.patch('requests.Session.post', side_effect=[
+            request_exception.ConnectionError('Failed Request'),
+            mock.Mock(),
+        ]) as mock_request_post, mock.patch('time.sleep'), \
+                mock.patch.object(event_dispatcher, '_serialize', wraps=event_dispatcher._serialize) as mock_serialize:
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        mock_serialize.assert_called_once_with(params)
+        self.assertEqual(2, mock_request_post.call_count)
+        first_body = mock_request_post.call_args_list[0][1]['data']
+        self.assertIs(first_body, mock_request_post.call_args_list[1][1]['data'])
+
+    def test_dispatch_event__gives_up_after_retries(self):
+        """ Test that dispatch event logs the error once all retries failed. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'a': '111001'})
+
+        with mock.patch(
+            'requests.Session.get', side_effect=request_exception.Timeout('Timed out'),
+        ) as mock_request_get, mock.patch('time.sleep'), \
+                mock.patch.object(event_dispatcher.logger, 'error') as mock_log_error:
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        self.assertEqual(EventDispatchConfig.RETRIES + 1, mock_request_get.call_count)
+        mock_log_error.assert_called_once_with('Dispatch event failed. Error: %s', mock.ANY)
+
+    def test_dispatch_event__does_not_retry_client_errors(self):
+        """ Test that dispatch event does not retry requests rejected by the backend. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'a': '111001'})
+        response = mock.Mock(status_code=400)
+
+        with mock.patch(
+            'requests.Session.get', side_effect=request_exception.HTTPError('Bad Request', response=response),
+        ) as mock_request_get, mock.patch('time.sleep') as mock_sleep, \
+                mock.patch.object(event_dispatcher.logger, 'error'):
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        self.assertEqual(1, mock_request_get.call_count)
+        mock_sleep.assert_not_called()
+
+    def test_dispatch_event__retries_post_requests_not_processed_by_backend(self):
+        """ Test that dispatch event retries POST requests failing to connect or refused with 429 or 503. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'accountId': '111001'}, http_verb='POST')
+
+        with mock.patch('requests.Session.post', side_effect=[
+            request_exception.ConnectTimeout('Timed out'),
+            request_exception.HTTPError('Too Many Requests', response=mock.Mock(status_code=429)),
+            request_exception.HTTPError('Service Unavailable', response=mock.Mock(status_code=503)),
+            mock.Mock(),
+        ]) as mock_request_post, mock.patch('time.sleep'), \
+                mock.patch.object(event_dispatcher.logger, 'error') as mock_log_error:
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        self.assertEqual(4, mock_request_post.call_count)
+        mock_log_error.assert_not_called()
+
+    def test_dispatch_event__does_not_retry_post_requests_possibly_processed(self):
+        """ Test that dispatch event does not retry POST requests the backend may have processed. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'accountId': '111001'}, http_verb='POST')
+
+        for error in (
+            request_exception.ReadTimeout('Timed out'),
+            request_exception.HTTPError('Internal Server Error', response=mock.Mock(status_code=500)),
+            request_exception.HTTPError('Gateway Timeout', response=mock.Mock(status_code=504)),
+        ):
+            with mock.patch('requests.Session.post', side_effect=error) as mock_request_post, \
+                    mock.patch('time.sleep') as mock_sleep, \
+                    mock.patch.object(event_dispatcher.logger, 'error') as mock_log_error:
+                event_dispatcher.EventDispatcher.dispatch_event(event)
+
+            self.assertEqual(1, mock_request_post.call_count)
+            mock_sleep.assert_not_called()
+            mock_log_error.assert_called_once_with('Dispatch event failed. Error: %s', error)
 
     def test_dispatch_event__post_request(self):
         """ Test that dispatch event fires off requests call with provided URL, params, HTTP verb and headers. """
@@ -51,10 +263,69 @@ class EventDispatcherTest(unittest.TestCase):
 
         mock_request_post.assert_called_once_with(
             url,
-            data=json.dumps(params),
+            data=mock.ANY,
             headers={'Content-Type': 'application/json'},
             timeout=EventDispatchConfig.REQUEST_TIMEOUT,
         )
+        data = mock_request_post.call_args[1]['data']
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(params, json.loads(data))
+
+    def test_dispatch_event__post_request_sets_default_content_type(self):
+        """ Test that dispatch event sends POST bodies as JSON when the event does not set a content type. """
+
+        url = 'https://www.optimizely.com'
+        params = {'accountId': '111001'}
+
+        for headers, expected_headers in (
+            (None, {'Content-Type': 'application/json'}),
+            ({'X-Test': '1'}, {'Content-Type': 'application/json', 'X-Test': '1'}),
+            ({'Content-Type': 'text/plain'}, {'Content-Type': 'text/plain'}),
+        ):
+            event = event_builder.Event(url, params, http_verb='POST', headers=headers)
+
+            with mock.patch('requests.Session.post') as mock_request_post:
+                event_dispatcher.EventDispatcher.dispatch_event(event)
+
+            mock_request_post.assert_called_once_with(
+                url, data=mock.ANY, headers=expected_headers, timeout=EventDispatchConfig.REQUEST_TIMEOUT,
+            )
+            self.assertEqual(headers, event.headers)
+
+    def test_dispatch_event__post_request_without_orjson(self):
+        """ Test that dispatch event serializes the POST body with the json module when orjson is not installed. """
+
+        url = 'https://www.optimizely.com'
+        params = {
+            'accountId': '111001',
+            'eventName': 'test_event',
+            'eventEntityId': '111028',
+            'visitorId': 'oeutest_user',
+        }
+        event = event_builder.Event(url, params, http_verb='POST', headers={'Content-Type': 'application/json'})
+
+        with mock.patch.object(event_dispatcher, 'orjson', None), \
+                mock.patch('requests.Session.post') as mock_request_post:
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        mock_request_post.assert_called_once_with(
+            url,
+            data=json.dumps(params).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            timeout=EventDispatchConfig.REQUEST_TIMEOUT,
+        )
+
+    def test_dispatch_event__unknown_http_verb(self):
+        """ Test that dispatch event does not send events with an unsupported HTTP verb. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'a': '111001'}, http_verb='PUT')
+
+        with mock.patch('requests.Session.get') as mock_request_get, \
+                mock.patch('requests.Session.post') as mock_request_post:
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        mock_request_get.assert_not_called()
+        mock_request_post.assert_not_called()
 
     def test_dispatch_event__handle_request_exception(self):
         """ Test that dispatch event handles exceptions and logs error. """
@@ -70,13 +341,326 @@ class EventDispatcherTest(unittest.TestCase):
 
         with mock.patch(
             'requests.Session.post', side_effect=request_exception.RequestException('Failed Request'),
-        ) as mock_request_post, mock.patch('logging.error') as mock_log_error:
+        ) as mock_request_post, mock.patch.object(event_dispatcher.logger, 'error') as mock_log_error:
             event_dispatcher.EventDispatcher.dispatch_event(event)
 
         mock_request_post.assert_called_once_with(
             url,
-            data=json.dumps(params),
+            data=mock.ANY,
             headers={'Content-Type': 'application/json'},
             timeout=EventDispatchConfig.REQUEST_TIMEOUT,
         )
-        mock_log_error.assert_called_once_with('Dispatch event failed. Error: Failed Request')
+        mock_log_error.assert_called_once_with('Dispatch event failed. Error: %s', mock.ANY)
+        self.assertEqual('Failed Request', str(mock_log_error.call_args[0][1]))
+
+    def test_dispatch_event__skips_requests_while_circuit_is_open(self):
+        """ Test that dispatch event stops sending requests to a host after repeated failures. """
+
+        url = 'https://www.optimizely.com'
+        event = event_builder.Event(url, {'a': '111001'})
+
+        with mock.patch(
+            'requests.Session.get', side_effect=request_exception.ConnectionError('Failed Request'),
+        ) as mock_request_get, mock.patch('time.sleep'), \
+                mock.patch.object(event_dispatcher.logger, 'error') as mock_log_error:
+            for _ in range(EventDispatchConfig.CIRCUIT_FAILURE_THRESHOLD + 1):
+                event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        self.assertEqual(
+            EventDispatchConfig.CIRCUIT_FAILURE_THRESHOLD * (EventDispatchConfig.RETRIES + 1),
+            mock_request_get.call_count
+        )
+        mock_log_error.assert_called_with(
+            'Dispatch event failed. Error: requests to %s are paused after repeated failures.', 'www.optimizely.com'
+        )
+
+    def test_dispatch_event__drops_events_when_bulkhead_is_full(self):
+        """ Test that dispatch event does not send the event when no request slot frees up in time. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'a': '111001'})
+
+        with mock.patch.object(event_dispatcher, '_bulkhead') as mock_bulkhead, \
+                mock.patch('requests.Session.get') as mock_request_get, \
+                mock.patch.object(event_dispatcher.logger, 'error') as mock_log_error:
+            mock_bulkhead.acquire.return_value = False
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        mock_bulkhead.acquire.assert_called_once_with(timeout=EventDispatchConfig.REQUEST_TIMEOUT)
+        mock_bulkhead.release.assert_not_called()
+        mock_request_get.assert_not_called()
+        mock_log_error.assert_called_once_with('Dispatch event failed. Error: too many event requests in flight.')
+
+    def test_dispatch_event__keeps_circuit_trial_when_bulkhead_is_full(self):
+        """ Test that an event not sent for lack of a request slot does not use up the trial of a half-open circuit. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'a': '111001'})
+        breaker = event_dispatcher._get_circuit_breaker('www.optimizely.com')
+        breaker.opened_at = time.monotonic() - EventDispatchConfig.CIRCUIT_RECOVERY_TIMEOUT
+
+        with mock.patch.object(event_dispatcher, '_bulkhead') as mock_bulkhead, \
+                mock.patch.object(event_dispatcher.logger, 'error'):
+            mock_bulkhead.acquire.return_value = False
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        self.assertTrue(breaker.allow())
+
+    def test_dispatch_event__releases_bulkhead_slot_when_circuit_is_open(self):
+        """ Test that dispatch event frees its request slot when the circuit of the host is open. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'a': '111001'})
+        event_dispatcher._get_circuit_breaker('www.optimizely.com').opened_at = time.monotonic()
+
+        with mock.patch.object(event_dispatcher, '_bulkhead') as mock_bulkhead, \
+                mock.patch('requests.Session.get') as mock_request_get, \
+                mock.patch.object(event_dispatcher.logger, 'error'):
+            event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        mock_request_get.assert_not_called()
+        mock_bulkhead.acquire.assert_called_once()
+        mock_bulkhead.release.assert_called_once_with()
+
+    def test_dispatch_event__releases_bulkhead_slot(self):
+        """ Test that dispatch event frees its request slot whether the request succeeds or fails. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'a': '111001'})
+
+        for side_effect in (None, request_exception.InvalidURL('Invalid URL')):
+            with mock.patch.object(event_dispatcher, '_bulkhead') as mock_bulkhead, \
+                    mock.patch('requests.Session.get', side_effect=side_effect), \
+                    mock.patch.object(event_dispatcher.logger, 'error'):
+                event_dispatcher.EventDispatcher.dispatch_event(event)
+
+            mock_bulkhead.acquire.assert_called_once()
+            mock_bulkhead.release.assert_called_once_with()
+
+    def test_dispatch_event__client_errors_do_not_open_circuit(self):
+        """ Test that requests rejected by the backend do not count as failures of the host. """
+
+        url = 'https://www.optimizely.com'
+        event = event_builder.Event(url, {'a': '111001'})
+        response = mock.Mock(status_code=400)
+
+        with mock.patch(
+            'requests.Session.get', side_effect=request_exception.HTTPError('Bad Request', response=response),
+        ) as mock_request_get, mock.patch.object(event_dispatcher.logger, 'error'):
+            for _ in range(EventDispatchConfig.CIRCUIT_FAILURE_THRESHOLD + 1):
+                event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        self.assertEqual(EventDispatchConfig.CIRCUIT_FAILURE_THRESHOLD + 1, mock_request_get.call_count)
+
+    def test_dispatch_event__too_many_requests_open_circuit(self):
+        """ Test that requests refused with 429 count as failures of the host. """
+
+        event = event_builder.Event('https://www.optimizely.com', {'accountId': '111001'}, http_verb='POST')
+        response = mock.Mock(status_code=429)
+
+        with mock.patch(
+            'requests.Session.post', side_effect=request_exception.HTTPError('Too Many Requests', response=response),
+        ) as mock_request_post, mock.patch('time.sleep'), \
+                mock.patch.object(event_dispatcher.logger, 'error') as mock_log_error:
+            for _ in range(EventDispatchConfig.CIRCUIT_FAILURE_THRESHOLD + 1):
+                event_dispatcher.EventDispatcher.dispatch_event(event)
+
+        self.assertEqual(
+            EventDispatchConfig.CIRCUIT_FAILURE_THRESHOLD * (EventDispatchConfig.RETRIES + 1),
+            mock_request_post.call_count
+        )
+        mock_log_error.assert_called_with(
+            'Dispatch event failed. Error: requests to %s are paused after repeated failures.', 'www.optimizely.com'
+        )
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_after_failure_threshold(self):
+        """ Test that the circuit opens after consecutive failures and a success resets the count. """
+
+        breaker = event_dispatcher.CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+        self.assertFalse(breaker.allow())
+
+    def test_allows_one_trial_after_recovery_timeout(self):
+        """ Test that a single trial request is allowed once the recovery timeout passed. """
+
+        breaker = event_dispatcher.CircuitBreaker(failure_threshold=1, recovery_timeout=30)
+
+        with mock.patch('time.monotonic', return_value=100):
+            breaker.record_failure()
+        with mock.patch('time.monotonic', return_value=131):
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+
+        breaker.record_success()
+        self.assertFalse(breaker.is_open)
+        self.assertTrue(breaker.allow())
+
+
+class AsyncEventDispatcherTest(unittest.TestCase):
+    def test_dispatch_event(self):
+        """ Test that dispatch event sends the event without blocking the event loop. """
+
+        url = 'https://www.optimizely.com'
+        params = {'a': '111001', 'n': 'test_event', 'g': '111028', 'u': 'oeutest_user'}
+        event = event_builder.Event(url, params)
+        dispatcher = event_dispatcher.AsyncEventDispatcher()
+
+        async def dispatch_events():
+            await asyncio.gather(dispatcher.dispatch_event(event), dispatcher.dispatch_event(event))
+
+        with mock.patch('requests.Session.get') as mock_request_get:
+            asyncio.run(dispatch_events())
+
+        self.assertEqual(
+            [mock.call(url + '?a=111001&n=test_event&g=111028&u=oeutest_user',
+                       timeout=EventDispatchConfig.REQUEST_TIMEOUT)] * 2,
+            mock_request_get.call_args_list
+        )
+
+    def test_to_sync__schedules_events_on_loop(self):
+        """ Test that the synchronous dispatcher schedules events on the event loop. """
+
+        url = 'https://www.optimizely.com'
+        params = {'a': '111001', 'n': 'test_event', 'g': '111028', 'u': 'oeutest_user'}
+        event = event_builder.Event(url, params)
+        dispatcher = event_dispatcher.AsyncEventDispatcher()
+
+        async def dispatch_event():
+            sync_dispatcher = dispatcher.to_sync(asyncio.get_running_loop())
+            sync_dispatcher.dispatch_event(event)
+            # let the scheduled dispatch run
+            while not mock_request_get.called:
+                await asyncio.sleep(0.01)
+
+        with mock.patch('requests.Session.get') as mock_request_get:
+            asyncio.run(asyncio.wait_for(dispatch_event(), 5))
+
+        mock_request_get.assert_called_once_with(
+            url + '?a=111001&n=test_event&g=111028&u=oeutest_user', timeout=EventDispatchConfig.REQUEST_TIMEOUT
+        )
+
+
+class BatchingEventDispatcherTest(unittest.TestCase):
+    def _log_event(self, visitor_id, revision='42'):
+        params = {
+            'account_id': '12001',
+            'project_id': '111001',
+            'revision': revision,
+            'visitors': [{'visitor_id': visitor_id, 'attributes': [], 'snapshots': []}],
+        }
+        return log_event.LogEvent(
+            'https://logx.optimizely.com/v1/events', params, headers={'Content-Type': 'application/json'}
+        )
+
+    def test_flush__merges_visitors_of_events_with_same_batch_properties(self):
+        """ Test that flush dispatches events of the same account, project and revision as one event. """
+
+        mock_dispatcher = mock.Mock()
+        dispatcher = event_dispatcher.BatchingEventDispatcher(mock_dispatcher, flush_interval=60)
+        self.addCleanup(dispatcher.stop)
+
+        dispatcher.dispatch_event(self._log_event('user_1'))
+        dispatcher.dispatch_event(self._log_event('user_2', revision='43'))
+        dispatcher.dispatch_event(self._log_event('user_3'))
+        dispatcher.flush()
+
+        self.assertEqual(2, mock_dispatcher.dispatch_event.call_count)
+        first_event = mock_dispatcher.dispatch_event.call_args_list[0][0][0]
+        second_event = mock_dispatcher.dispatch_event.call_args_list[1][0][0]
+
+        self.assertEqual('https://logx.optimizely.com/v1/events', first_event.url)
+        self.assertEqual('POST', first_event.http_verb)
+        self.assertEqual({'Content-Type': 'application/json'}, first_event.headers)
+        self.assertEqual('42', first_event.params['revision'])
+        self.assertEqual(['user_1', 'user_3'], [visitor['visitor_id'] for visitor in first_event.params['visitors']])
+        self.assertEqual('43', second_event.params['revision'])
+        self.assertEqual(['user_2'], [visitor['visitor_id'] for visitor in second_event.params['visitors']])
+        self.assertTrue(dispatcher.event_queue.empty())
+
+    def test_flush__serializes_each_merged_batch_once(self):
+        """ Test that the events of a batch are sent as one POST body encoded with a single serialization. """
+
+        dispatcher = event_dispatcher.BatchingEventDispatcher(flush_interval=60)
+
+        self.addCleanup(dispatcher.stop)
+        event_dispatcher._circuit_breakers.clear()
+
+        with mock.patch('requests.Session.post') as mock_request_post, \
+                mock.patch.object(event_dispatcher, '_serialize', wraps=event_dispatcher._serialize) as mock_serialize:
+            for visitor_id in ('user_1', 'user_2', 'user_3'):
+                dispatcher.dispatch_event(self._log_event(visitor_id))
+            dispatcher.flush()
+
+        mock_serialize.assert_called_once()
+        mock_request_post.assert_called_once()
+        body = json.loads(mock_request_post.call_args[1]['data'])
+        self.assertEqual(['user_1', 'user_2', 'user_3'], [visitor['visitor_id'] for visitor in body['visitors']])
+
+    def test_flush__does_not_merge_get_events(self):
+        """ Test that flush dispatches GET events unchanged. """
+
+        mock_dispatcher = mock.Mock()
+        dispatcher = event_dispatcher.BatchingEventDispatcher(mock_dispatcher, flush_interval=60)
+        self.addCleanup(dispatcher.stop)
+        event = event_builder.Event('https://www.optimizely.com', {'a': '111001'})
+
+        dispatcher.dispatch_event(event)
+        dispatcher.dispatch_event(event)
+        dispatcher.flush()
+
+        self.assertEqual([mock.call(event), mock.call(event)], mock_dispatcher.dispatch_event.call_args_list)
+
+    def test_dispatch_event__flushes_on_batch_size(self):
+        """ Test that queued events are dispatched in the background once batch_size events are queued. """
+
+        mock_dispatcher = mock.Mock()
+        dispatcher = event_dispatcher.BatchingEventDispatcher(mock_dispatcher, batch_size=2, flush_interval=60)
+        self.addCleanup(dispatcher.stop)
+
+        dispatcher.dispatch_event(self._log_event('user_1'))
+        dispatcher.dispatch_event(self._log_event('user_2'))
+
+        for _ in range(500):
+            if mock_dispatcher.dispatch_event.called:
+                break
+            time.sleep(0.01)
+
+        mock_dispatcher.dispatch_event.assert_called_once()
+        event = mock_dispatcher.dispatch_event.call_args[0][0]
+        self.assertEqual(['user_1', 'user_2'], [visitor['visitor_id'] for visitor in event.params['visitors']])
+
+    def test_dispatch_event__drops_events_when_queue_is_full(self):
+        """ Test that events dispatched to a full queue are dropped with a warning. """
+
+        mock_logger = mock.Mock()
+        dispatcher = event_dispatcher.BatchingEventDispatcher(
+            mock.Mock(), logger=mock_logger, batch_size=5, flush_interval=60, queue_capacity=1
+        )
+        self.addCleanup(dispatcher.stop)
+
+        dispatcher.dispatch_event(self._log_event('user_1'))
+        dispatcher.dispatch_event(self._log_event('user_2'))
+
+        self.assertEqual(1, dispatcher.event_queue.qsize())
+        mock_logger.warning.assert_called_once_with('Event not accepted by the queue. Current size: 1')
+
+    def test_stop__dispatches_queued_events_and_stops_thread(self):
+        """ Test that stop dispatches the queued events, stops the background thread and the exit flush. """
+
+        mock_dispatcher = mock.Mock()
+        with mock.patch('atexit.unregister') as mock_unregister:
+            dispatcher = event_dispatcher.BatchingEventDispatcher(mock_dispatcher, flush_interval=60)
+            dispatcher.dispatch_event(self._log_event('user_1'))
+            dispatcher.stop()
+
+        self.assertFalse(dispatcher.executor.is_alive())
+        mock_unregister.assert_called_once_with(dispatcher.flush)
+        mock_dispatcher.dispatch_event.assert_called_once()
+
+        dispatcher.dispatch_event(self._log_event('user_2'))
+        self.assertEqual(0, dispatcher.event_queue.qsize())
@@ -136,3 +136,27 @@ class GetLoggerTests(unittest.TestCase):
         logger_name = f'test-logger-{uuid.uuid4()}'
         reset_logger = _logger.reset_logger(logger_name, level=logging.DEBUG)
         self.assertEqual(logging.DEBUG, reset_logger.level)
+
+
+class IsDebugEnabledTests(unittest.TestCase):
+    def test_is_debug_enabled__standard_logger(self):
+        """Test that is_debug_enabled follows the level of standard python loggers."""
+        logger_name = f'test-logger-{uuid.uuid4()}'
+        self.assertFalse(_logger.is_debug_enabled(_logger.reset_logger(logger_name, level=logging.INFO)))
+        self.assertTrue(_logger.is_debug_enabled(_logger.reset_logger(logger_name, level=logging.DEBUG)))
+
+    def test_is_debug_enabled__custom_logger(self):
+        """Test that is_debug_enabled assumes custom loggers emit debug messages."""
+        self.assertTrue(_logger.is_debug_enabled(_logger.BaseLogger()))
+
+
+class IsInfoEnabledTests(unittest.TestCase):
+    def test_is_info_enabled__standard_logger(self):
+        """Test that is_info_enabled follows the level of standard python loggers."""
+        logger_name = f'test-logger-{uuid.uuid4()}'
+        self.assertFalse(_logger.is_info_enabled(_logger.reset_logger(logger_name, level=logging.WARNING)))
+        self.assertTrue(_logger.is_info_enabled(_logger.reset_logger(logger_name, level=logging.INFO)))
+
+    def test_is_info_enabled__custom_logger(self):
+        """Test that is_info_enabled assumes custom loggers emit info messages."""
+        self.assertTrue(_logger.is_info_enabled(_logger.BaseLogger()))
@@ -1161,6 +1161,8 @@ class OptimizelyTest(base.BaseTest):
             'test_experiment',
             mock.ANY,
             self.optimizely.logger,
+            audience_results=None,
+            build_messages=True,
         )
 
     def test_activate__with_attributes__invalid_attributes(self):
@@ -10,6 +10,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import copy
 import json
 
 from unittest import mock
@@ -1798,6 +1799,32 @@ class UserContextTest(base.BaseTest):
         status = user_context.get_forced_decision(context_with_flag_1)
         self.assertEqual(status.variation_key, decision_for_flag_2.variation_key)
 
+    def test_get_forced_decisions_for_flag(self):
+        """
+        Should return the forced decisions of a flag keyed by rule key.
+        """
+        opt_obj = optimizely.Optimizely(json.dumps(self.config_dict_with_features))
+        user_context = opt_obj.create_user_context("test_user", {})
+
+        self.assertEqual({}, user_context.get_forced_decisions_for_flag('f1'))
+
+        decision_for_flag_1 = OptimizelyUserContext.OptimizelyForcedDecision('v1')
+        decision_for_rule_1 = OptimizelyUserContext.OptimizelyForcedDecision('v2')
+        decision_for_flag_2 = OptimizelyUserContext.OptimizelyForcedDecision('v3')
+        user_context.set_forced_decision(OptimizelyUserContext.OptimizelyDecisionContext('f1', None),
+                                         decision_for_flag_1)
+        user_context.set_forced_decision(OptimizelyUserContext.OptimizelyDecisionContext('f1', 'r1'),
+                                         decision_for_rule_1)
+        user_context.set_forced_decision(OptimizelyUserContext.OptimizelyDecisionContext('f2', 'r1'),
+                                         decision_for_flag_2)
+
+        self.assertEqual(
+            {None: decision_for_flag_1, 'r1': decision_for_rule_1},
+            user_context.get_forced_decisions_for_flag('f1')
+        )
+        self.assertEqual({'r1': decision_for_flag_2}, user_context.get_forced_decisions_for_flag('f2'))
+        self.assertEqual({}, user_context.get_forced_decisions_for_flag('f3'))
+
     def test_remove_forced_decision_return_valid_decision__forced_decision(self):
         """
         Should remove forced decision on removing forced decision.
@@ -1937,6 +1964,33 @@ class UserContextTest(base.BaseTest):
         self.assertEqual(user_context.get_forced_decision(context_with_rule).variation_key, 'z')
         self.assertIsNone(user_context_2.get_forced_decision(context_with_rule))
 
+    def test_decision_context__equal_keys_are_equal_and_hash_the_same(self):
+        """
+        Should treat decision contexts with the same flag and rule keys as the same key, including copies.
+        """
+        context = OptimizelyUserContext.OptimizelyDecisionContext('f1', 'r1')
+        context_copy = copy.deepcopy(context)
+
+        self.assertEqual(context, OptimizelyUserContext.OptimizelyDecisionContext('f1', 'r1'))
+        self.assertEqual(hash(context), hash(OptimizelyUserContext.OptimizelyDecisionContext('f1', 'r1')))
+        self.assertEqual(context, context_copy)
+        self.assertEqual(hash(context), hash(context_copy))
+        self.assertNotEqual(context, OptimizelyUserContext.OptimizelyDecisionContext('f1', None))
+
+    def test_decision_context__hash_follows_updated_keys(self):
+        """
+        Should hash a decision context by its current keys after the flag or rule key is set.
+        """
+        context = OptimizelyUserContext.OptimizelyDecisionContext('f1', 'r1')
+        hash(context)
+
+        context.flag_key = 'f2'
+        self.assertEqual(hash(context), hash(OptimizelyUserContext.OptimizelyDecisionContext('f2', 'r1')))
+
+        context.rule_key = None
+        self.assertEqual(context, OptimizelyUserContext.OptimizelyDecisionContext('f2', None))
+        self.assertEqual(hash(context), hash(OptimizelyUserContext.OptimizelyDecisionContext('f2', None)))
+
     def test_forced_decision_sync_return_correct_number_of_calls(self):
         """
         Should return valid number of call on running forced decision calls in thread.
@@ -34,6 +34,12 @@ class UserProfileTest(unittest.TestCase):
 
         self.assertIsNone(self.profile.get_variation_for_experiment('199924'))
 
+    def test_get_variation_for_experiment__empty_decision(self):
+        """ Test that None is returned if the experiment bucket has no variation ID. """
+
+        self.profile.experiment_bucket_map['199924'] = {}
+        self.assertIsNone(self.profile.get_variation_for_experiment('199924'))
+
     def test_set_variation_for_experiment__no_previous_decision(self):
         """ Test that decision for new experiment/variation is stored correctly. """
 